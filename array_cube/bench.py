@@ -0,0 +1,42 @@
+"""
+Benchmarks for the array representation of a 2x2 rubiks cube.
+
+Run with python -m array_cube.bench
+"""
+
+from timeit import timeit
+
+import numpy as np
+
+from .manipulations import dir_map, new_cube, roll_batch, roll_str
+
+
+def cubes_per_second(n, batched=True, repeat=3, seed=0):
+    """
+    Measure the throughput of rolling n cubes with one random move each.
+
+    :param n: Number of cubes rolled per run
+    :param batched: Whether to use roll_batch or call roll_str per cube
+    :param repeat: Number of runs, the fastest of which is reported
+    :returns: Cubes rolled per second
+    """
+    rng = np.random.default_rng(seed)
+    cubes = np.broadcast_to(new_cube(), (n, 6, 2, 2)).copy()
+    moves = rng.choice(list(dir_map), n)
+    out = np.empty_like(cubes)
+    if batched:
+        run = lambda: roll_batch(cubes, moves, out=out)
+    else:
+        run = lambda: [roll_str(c, m) for c, m in zip(cubes, moves)]
+    return n / min(timeit(run, number=1) for _ in range(repeat))
+
+
+def main():
+    print(f"{'N':>10}{'roll_str':>16}{'roll_batch':>16}  cubes per second")
+    for n in (1, 10**3, 10**6):
+        # Rolling a million cubes one at a time takes about a minute.
+        scalar = f"{cubes_per_second(n, batched=False):,.0f}" if n <= 10**3 else "-"
+        print(f"{n:>10,}{scalar:>16}{cubes_per_second(n):>16,.0f}")
+
+if __name__ == "__main__":
+    main()
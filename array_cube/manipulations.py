@@ -10,6 +10,7 @@ from enum import Enum
 import gc
 import numpy as np
 from random import randrange, choice
+from bit_cube.engine import MoveCompiler
 
 class Man(Enum):
     L = 0
@@ -119,12 +120,12 @@ def roll_str(cube, string):
     f, b, l, r, u, d represents an anticlockwise rotation to the front, back, left, right,
     upward, downward faces of the cube respectively.
 
+    The whole string is applied as a single permutation, see ROLL_COMPILER.
+
     :param string: A string where each character represents a roll operation on the cube.
                    Cannot contain any other characters other than the 12 specified above.
     """
-    for i in string:
-        cube = roll(cube, *dir_map[i])
-    return cube
+    return cube.ravel()[ROLL_COMPILER.compile(string)].reshape(cube.shape)
 
 def rot(cube, face, direction):
     """
@@ -145,11 +146,11 @@ def rot(cube, face, direction):
         cube[4] = np.rot90(cube[4], k=-direction)
         cube[5] = np.rot90(cube[5], k=direction)
     elif face == Man.L.value:
-        sl = [cube[Man.F.value], cube[Man.D.value], cube[Man.B.value, ::-1], cube[Man.U.value]]
+        sl = [cube[Man.F.value], cube[Man.D.value], cube[Man.B.value, ::-1, ::-1], cube[Man.U.value]]
         sl = np.roll(sl, direction, axis=0)
         cube[Man.F.value] = sl[0]
         cube[Man.D.value] = sl[1]
-        cube[Man.B.value, ::-1] = sl[2]
+        cube[Man.B.value, ::-1, ::-1] = sl[2]
         cube[Man.U.value] = sl[3]
         cube[Man.L.value] = np.rot90(cube[Man.L.value], k=-direction)
         cube[Man.R.value] = np.rot90(cube[Man.R.value], k=direction)
@@ -177,12 +178,12 @@ def rot_str(cube, string):
     u, l, f represents an anticlockwise rotation along the upward, leftward, frontward
     faces of the cube respectively.
 
+    The whole string is applied as a single permutation, see ROT_COMPILER.
+
     :param string: A string where each character represents a rotation operation on the cube.
                    Cannot contain any other characters other than the 6 specified above.
     """
-    for i in string:
-        cube = rot(cube, *dir_map[i])
-    return cube
+    return cube.ravel()[ROT_COMPILER.compile(string)].reshape(cube.shape)
 
 
 def randomize(cube, moves=500):
@@ -243,6 +244,103 @@ def cube_str(cube):
 
 def hash_cube(cube):
     """Hashes the current state of the cube."""
-    it = np.nditer(cube, flags=["common_dtype"])
-    ret = "".join((str(i.item()) for i in it))
+    return "".join(map(str, cube.ravel().tolist()))
+
+# The 24 tiles read as the digits of a base 6 number, most significant first.
+# 6**24 - 1 fits in an int64, so the products never overflow.
+KEY_WEIGHTS = np.int64(6) ** np.arange(23, -1, -1, dtype=np.int64)
+
+def key_cube(cube):
+    """
+    Pack the current state of the cube into a single integer.
+
+    Unlike hash_cube, the key is computed with a single dot product,
+    and key_cube(cube) == int(hash_cube(cube), 6).
+
+    :param cube: A 6x2x2 or flattened array representing a rubiks cube
+    :returns: An integer below 6**24, which fits in 63 bits
+    """
+    return int(cube.ravel() @ KEY_WEIGHTS)
+
+def key_cubes(cubes):
+    """
+    Pack every cube of a stack into a single integer, see key_cube.
+
+    :param cubes: A (N, 6, 2, 2) or (N, 24) array of cubes
+    :returns: A uint64 array of the N keys
+    """
+    return (cubes.reshape(len(cubes), 24) @ KEY_WEIGHTS).astype(np.uint64)
+
+
+# Every roll and rotation as a permutation of the 24 tiles of a flattened cube,
+# such that tile i of the result is tile PERMS[k][i] of the original cube.
+TILES = np.arange(24).reshape(6, 2, 2)
+ROLL_PERMS = {k: roll(TILES, *dir_map[k]).ravel() for k in dir_map}
+ROT_PERMS = {k: rot(TILES, *dir_map[k]).ravel() for k in "LlFfUu"}
+
+def _frozen(p):
+    """Convert a permutation to a read-only index array, safe to share from a cache."""
+    ret = np.array(p)
+    ret.flags.writeable = False
     return ret
+
+# Compilers of move strings into single cached permutations, see roll_str and rot_str.
+ROLL_COMPILER = MoveCompiler({k: tuple(p.tolist()) for k, p in ROLL_PERMS.items()}, _frozen)
+ROT_COMPILER = MoveCompiler({k: tuple(p.tolist()) for k, p in ROT_PERMS.items()}, _frozen)
+
+_ROLL_MOVES = "".join(dir_map)
+_ROT_MOVES = "LlFfUu"
+_ROLL_STACK = np.array([ROLL_PERMS[k] for k in _ROLL_MOVES])
+_ROT_STACK = np.array([ROT_PERMS[k] for k in _ROT_MOVES])
+
+def _move_index(moves, names):
+    """Map a sequence of move characters to their indices in names."""
+    lut = np.full(128, -1)
+    lut[[ord(c) for c in names]] = np.arange(len(names))
+    codes = np.asarray(moves, dtype="U1").view(np.uint32)
+    idx = lut[np.minimum(codes, 127)]
+    if (idx < 0).any():
+        raise ValueError(f"moves must be characters in {names}")
+    return idx
+
+def _apply_batch(cubes, compiler, stack, names, moves, out):
+    flat = cubes.reshape(len(cubes), 24)
+    if isinstance(moves, str):
+        ret = flat[:, compiler.compile(moves)]
+    else:
+        ret = np.take_along_axis(flat, stack[_move_index(moves, names)], axis=1)
+    if out is None:
+        return ret.reshape(cubes.shape)
+    out[...] = ret.reshape(out.shape)
+    return out
+
+def roll_batch(cubes, moves, out=None):
+    """
+    Perform roll operations on a stack of cubes.
+
+    The result is identical to calling roll_str on every cube, with every
+    move applied to the whole stack as a single gather.
+
+    :param cubes: A (N, 6, 2, 2) or (N, 24) array of cubes
+    :param moves: A string of roll operations applied to every cube, see roll_str,
+                  or a sequence of N characters, one operation per cube
+    :param out: An optional array of the same shape to write the result to,
+                which may be cubes itself
+    :returns: The array of rolled cubes
+    """
+    return _apply_batch(cubes, ROLL_COMPILER, _ROLL_STACK, _ROLL_MOVES, moves, out)
+
+def rot_batch(cubes, moves, out=None):
+    """
+    Perform rotation operations on a stack of cubes.
+
+    The result is identical to calling rot_str on every cube, see roll_batch.
+
+    :param cubes: A (N, 6, 2, 2) or (N, 24) array of cubes
+    :param moves: A string of rotation operations applied to every cube, see rot_str,
+                  or a sequence of N characters, one operation per cube
+    :param out: An optional array of the same shape to write the result to,
+                which may be cubes itself
+    :returns: The array of rotated cubes
+    """
+    return _apply_batch(cubes, ROT_COMPILER, _ROT_STACK, _ROT_MOVES, moves, out)
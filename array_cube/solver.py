@@ -1,5 +1,11 @@
 import numpy as np
-from manipulations import *
+from time import perf_counter
+from bit_cube.convert import array_to_bit
+from bit_cube.coord import solvable
+from bit_cube.instrument import LevelStats, estimate_memory
+from bit_cube.solver import Solver as _BitSolver
+from .manipulations import *
+from .symmetry import COMPOSE, FIXED, MOVE_MAPS, canonical, translate
 
 
 class Solver:
@@ -10,61 +16,177 @@ class Solver:
     as it reduces the memory required due to less objects being created.
     """
     op = ["L", "l", "F", "f", "R", "r", "B", "b", "U", "u", "D", "d"]
-    def __init__(self, cube):
+    # Moves of the level search, which never move the down-back-right corner.
+    level_op = ["L", "l", "F", "f", "U", "u"]
+    def __init__(self, cube, vectorized=True, observer=None):
         """
         Initializes a solver for a specific cube.
 
         :param cube: The Cube object to be solved.
+        :param vectorized: Whether to search a whole depth at a time, see solve_levels.
+        :param observer: An optional bit_cube.instrument.Observer notified
+                         of the progress of the search after every depth.
         """
-        self.queue = [cube]
-        self.visited = {hash_cube(cube): (None, "")}
+        self.observer = observer
+        self.org = cube
+        self.vectorized = vectorized
+        self.rotation = None
+        self.queue = []
+        self.visited = {}
         self.type = cube.shape
-        self._init_final()
+        self.target = key_cube(new_cube())
 
-    def _init_final(self):
+    def _start(self):
         """
-        Initializes the final nodes of the graph.
+        Queue the cube for the search.
 
-        As the cube is not rotation invariant,
-        several final nodes are required for every
-        different rotation of the completed cube.
+        Only the canonical rotation of every state is stored, along with
+        the path to it and the rotation mapping its moves to the cube.
         """
-        self.final = []
-        # acc = 0
-        for i in ["", "L", "l", "F", "f", "LL"]:
-            c = rot_str(new_cube(), i)
-            for j in range(0,4):
-                cc = rot(c, Man.U, j)
-                self.final.append(hash_cube(cc))
+        cube, self.rotation = canonical(self.org)
+        self.queue = [cube]
+        self.visited = {key_cube(cube): (None, "", self.rotation)}
 
     def solve(self):
         """
         Find the minimal operations required to solve the rubiks cube.
 
+        :returns: The string sequence of operations that solves the cube,
+                  or None if the cube cannot be solved.
+        """
+        if not solvable(array_to_bit(self.org)): return None
+        self._start()
+        if self.vectorized:
+            return self._run("levels", self.solve_levels)
+        return self._run("bfs", self.solve_bfs)
+
+    def _run(self, method, search):
+        """Run a search, notifying the observer of its start and result."""
+        if self.observer is None: return search()
+        self.observer.on_start(self, method)
+        s = search()
+        self.observer.on_finish(self, s)
+        return s
+
+    def _level(self, depth, expanded, generated, frontier, visited, start, *containers):
+        """Notify the observer of the statistics of a depth of the search."""
+        self.observer.on_level(self, LevelStats(depth, expanded, generated, generated - frontier, frontier, visited,
+                                                perf_counter() - start, estimate_memory(*containers)))
+
+    def solve_bfs(self):
+        """
+        Find the minimal operations required to solve the rubiks cube, one depth at a time.
+
         :returns: The string sequence of operations that solves the cube.
         """
-        if hash_cube(self.queue[0]) in self.final: return ""
+        if key_cube(self.queue[0]) == self.target: return ""
+        depth = 0
         while self.queue:
-            s = self.search()
+            frontier, self.queue = self.queue, []
+            if self.observer is not None:
+                start = perf_counter()
+            s = None
+            for expanded, step in enumerate(frontier, 1):
+                s = self.expand(step)
+                if s is not None: break
+            if self.observer is not None:
+                self._level(depth, expanded, expanded * len(self.op), len(self.queue),
+                            len(self.visited), start, self.visited, self.queue)
             if s is not None: return s
+            depth += 1
+
+    def solve_iter(self):
+        """
+        Find every optimal solution of the rubiks cube, lazily.
+
+        The level search keeps a single parent for every state and stops at the
+        first solution, so it cannot enumerate the others. The cube is instead
+        converted to the integer representation and searched by bit_cube, see
+        bit_cube.solver.Solver.solve_iter.
+
+        :returns: A generator of LevelStats after every depth of the search,
+                  followed by the string sequences of operations solving the cube.
+        """
+        return _BitSolver(array_to_bit(self.org)).solve_iter()
+
+    def solve_levels(self):
+        """
+        Find the minimal operations required to solve the rubiks cube, a whole depth at a time.
+
+        Every depth of the search is a (N, 24) array of flattened cubes, and
+        all moves are applied to it with a single gather of tile permutations.
+        The canonical cube is only turned along the L, F and U faces, which keeps
+        every state canonical, so the 21 other tiles packed 3 bits each into
+        a uint64 identify a state. New states are deduplicated with np.unique
+        and np.isin against the two previous depths, the only ones a move can
+        lead back to. Each depth keeps the parent and move of its states, so
+        the path is rebuilt backwards from the solved cube.
+
+        :returns: The string sequence of operations that solves the cube.
+        """
+        perms = np.array([ROLL_PERMS[m] for m in self.level_op])
+        free = np.setdiff1d(np.arange(24), FIXED)
+        shifts = np.arange(len(free), dtype=np.uint64) * np.uint64(3)
+
+        def keys(states):
+            return (states[:, free].astype(np.uint64) << shifts).sum(axis=1, dtype=np.uint64)
+
+        target = keys(new_cube().reshape(1, 24))[0]
+        level = self.queue[0].reshape(1, 24).astype(np.uint8)
+        seen = [keys(level)]
+        parents = []
+        moves = []
+        self.level_sizes = [1]
+        if seen[0][0] == target: return ""
+        while len(level):
+            if self.observer is not None:
+                start, expanded = perf_counter(), len(level)
+            states = level[:, perms].reshape(-1, 24)
+            k, idx = np.unique(keys(states), return_index=True)
+            new = ~np.isin(k, seen[-1], assume_unique=True)
+            if len(seen) > 1:
+                new &= ~np.isin(k, seen[-2], assume_unique=True)
+            k, idx = k[new], idx[new]
+            level = states[idx]
+            seen = [seen[-1], k]
+            parents.append(idx // len(perms))
+            moves.append(idx % len(perms))
+            self.level_sizes.append(len(level))
+            if self.observer is not None:
+                self._level(len(self.level_sizes) - 2, expanded, len(states), len(level), sum(self.level_sizes),
+                            start, level, seen[0], seen[1], *parents, *moves)
+
+            found = np.nonzero(k == target)[0]
+            if found.size:
+                i = found[0]
+                acc = ""
+                for p, m in zip(reversed(parents), reversed(moves)):
+                    acc = self.level_op[m[i]] + acc
+                    i = p[i]
+                return translate(acc, self.rotation)
 
     def search(self):
         """
-        Performs an iteration of the depth first search.
+        Performs an iteration of the breadth first search, expanding the first queued node.
+
+        :returns: The solution if it was found, otherwise None.
+        """
+        return self.expand(self.queue.pop(0))
+
+    def expand(self, step):
+        """
+        Generates and searches all adjacent nodes to a node for the finished state.
 
-        It generates and searches all adjacent nodes to the queued node
-        and searches it for the finished state.
         In this case, an adjcaent node is a cube state that is reachable
-        by performing a single roll operation.
+        by performing a single roll operation. New nodes are queued.
         """
-        step = self.queue.pop(0)
+        hc = key_cube(step)
+        _, path, parent = self.visited[hc]
         for s in self.op:
-            manstep = roll_str(step, s)
-            h = hash_cube(manstep)
+            manstep, rotation = canonical(roll_str(step, s))
+            h = key_cube(manstep)
             if h not in self.visited:
-                hc = hash_cube(step)
-                self.visited[h] = (hc, self.visited[hc][1] + s)
-                if h in self.final:
+                self.visited[h] = (hc, path + MOVE_MAPS[parent][s], COMPOSE[parent][rotation])
+                if h == self.target:
                     return self.visited[h][1]
-                print(self.visited[h][1])
                 self.queue.append(manstep)
@@ -0,0 +1,86 @@
+"""
+Reduction of a 6x2x2 array representing a 2x2 rubiks cube under whole cube rotations.
+
+The 24 rotations of a cube all describe the same physical puzzle. The rotation
+with the down-back-right corner solved is used as the canonical representative
+of the rotation class, so a search over canonical states explores up to 24
+times fewer states and has the solved cube as its only target.
+
+Rotations are precomputed as permutations of the 24 flattened tiles, so
+canonicalizing a cube is a single lookup and gather.
+"""
+
+import numpy as np
+from .manipulations import TILES, Man, dir_map, new_cube, rot_str
+
+# Whole cube rotations reaching each of the 24 orientations of a cube,
+# in the same order as the final states of the solver.
+ORIENTATIONS = tuple(i + "U"*j for i in ["", "L", "l", "F", "f", "LL"] for j in range(4))
+FACES = "LFRBUD"
+
+ROTATION_PERMS = np.array([rot_str(TILES, o).ravel() for o in ORIENTATIONS])
+
+# Flattened tiles of the down-back-right corner.
+FIXED = np.array([TILES[Man.R.value, 1, 1], TILES[Man.B.value, 1, 0], TILES[Man.D.value, 1, 1]])
+_SOURCES = ROTATION_PERMS[:, FIXED]
+_TARGET = new_cube().ravel()[FIXED]
+
+
+def _index(perm):
+    return next(i for i, p in enumerate(ROTATION_PERMS) if np.array_equal(p, perm))
+
+# COMPOSE[i][j] is the orientation reached by rotating by ORIENTATIONS[i] then ORIENTATIONS[j].
+COMPOSE = tuple(tuple(_index(ROTATION_PERMS[i][ROTATION_PERMS[j]]) for j in range(24)) for i in range(24))
+
+def _build_move_maps():
+    """
+    Map every move on a rotated cube to the equivalent move on the original cube.
+
+    Face g of a rotated solved cube shows the color, and thus the index, of
+    the original face moved onto it, which is turned in the same direction.
+    """
+    maps = []
+    for o in ORIENTATIONS:
+        faces = rot_str(new_cube(), o)
+        maps.append({i: (FACES[faces[f, 0, 0]] if d > 0 else FACES[faces[f, 0, 0]].lower())
+                     for i, (f, d) in dir_map.items()})
+    return tuple(maps)
+
+MOVE_MAPS = _build_move_maps()
+
+
+def canonical_index(cube):
+    """
+    Find the rotation taking a cube to its canonical representative.
+
+    :returns: An index into ORIENTATIONS
+    :raises ValueError: If no rotation solves the down-back-right corner
+    """
+    found = (cube.ravel()[_SOURCES] == _TARGET).all(axis=1)
+    i = int(found.argmax())
+    if not found[i]:
+        raise ValueError("cube has no orientation with a solved corner")
+    return i
+
+def canonical(cube):
+    """
+    Return the representative of the rotation class of a cube.
+
+    :returns: A pair of the canonical cube and the index of the rotation
+              in ORIENTATIONS that reaches it
+    """
+    i = canonical_index(cube)
+    return cube.ravel()[ROTATION_PERMS[i]].reshape(cube.shape), i
+
+def translate(string, rotation):
+    """
+    Map roll operations on a rotated cube to the original cube.
+
+    If string solves rot_str(cube, ORIENTATIONS[rotation]),
+    translate(string, rotation) solves cube.
+
+    :param string: A sequence of roll operations, see roll_str
+    :param rotation: An index into ORIENTATIONS
+    """
+    m = MOVE_MAPS[rotation]
+    return "".join(m[i] for i in string)
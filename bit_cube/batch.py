@@ -0,0 +1,141 @@
+"""
+Solve many 2x2 rubiks cubes at once over a pool of processes.
+
+solve_many shards its input across a ProcessPoolExecutor, as a single
+process solves one cube at a time because of the GIL. The input is read
+lazily in chunks and only a bounded number of chunks are in flight, so an
+input of millions of cubes, such as a generator over a file, is never held
+in memory at once.
+
+When a distance table is used it is copied once into shared memory, which
+every worker maps read-only, instead of being pickled to every process.
+Without a table the workers fall back to the bidirectional search.
+
+Cubes are given in the integer representation, see convert for the other
+representations, unless a solve function reading other states is given.
+"""
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from multiprocessing import shared_memory
+import os
+
+from .solver import Solver
+from .table import DistanceTable, default_path, open_table
+
+# The table of the worker processes, set by _init_worker.
+_table = None
+_shm = None
+
+
+def _attach(name, metric):
+    """
+    Map the table of the parent from shared memory.
+
+    The workers share the resource tracker of the parent, which owns
+    the segment and unlinks it once the pool is shut down.
+    """
+    shm = shared_memory.SharedMemory(name)
+    return shm, DistanceTable(shm.buf, metric)
+
+def _init_worker(name, metric):
+    global _table, _shm
+    if name is not None:
+        _shm, _table = _attach(name, metric)
+
+def _solve(cube, table):
+    return Solver(cube, table=table, bidirectional=True).solve()
+
+def _solve_one(cube):
+    return _solve(cube, _table)
+
+def _solve_chunk(start, cubes, solve):
+    return start, [solve(c, _table) for c in cubes]
+
+
+def share_table(table):
+    """
+    Copy a table into a new shared memory segment.
+
+    The caller owns the segment and must close and unlink it.
+
+    :param table: A DistanceTable
+    :returns: The SharedMemory holding the distances
+    """
+    shm = shared_memory.SharedMemory(create=True, size=len(table.data))
+    shm.buf[:] = table.data
+    return shm
+
+def _chunks(states, chunksize):
+    """Yield the start index and the list of cubes of every chunk of the input."""
+    it = iter(states)
+    start = 0
+    while True:
+        chunk = list(islice(it, chunksize))
+        if not chunk: return
+        yield start, chunk
+        start += len(chunk)
+
+def solve_many(states, workers=None, table=None, metric="quarter", ordered=True, chunksize=256, max_pending=None,
+               solve=_solve):
+    """
+    Solve many cubes over a pool of processes.
+
+    :param states: An iterable of cubes, read lazily
+    :param workers: Number of processes, by default os.cpu_count(). With
+                    one worker or fewer the cubes are solved in this process.
+    :param table: A DistanceTable, the path of a table file, or None for the
+                  default table of the metric. False disables the table.
+    :param metric: The metric of the default table
+    :param ordered: Whether results are yielded in input order, otherwise
+                    they are yielded as soon as their chunk is solved
+    :param chunksize: Number of cubes sent to a worker at once
+    :param max_pending: Number of chunks submitted but not yet yielded,
+                        by default twice the number of workers
+    :param solve: The function solving a state given the state and the table,
+                  or None, which must be picklable, by default the table or
+                  bidirectional Solver
+    :returns: A generator of (index, solution) pairs, index being the
+              position of the cube in states
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if table is None:
+        table = open_table(default_path(metric), metric)
+    elif table is not False and not isinstance(table, DistanceTable):
+        table = open_table(table, metric)
+    if not table:
+        table = None
+
+    if workers <= 1:
+        for i, c in enumerate(states):
+            yield i, solve(c, table)
+        return
+
+    if max_pending is None:
+        max_pending = 2 * workers
+    shm = share_table(table) if table is not None else None
+    try:
+        initargs = (shm.name if shm else None, table.metric if table else metric)
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=initargs) as pool:
+            chunks = _chunks(states, chunksize)
+            if ordered:
+                pending = deque(pool.submit(_solve_chunk, *c, solve) for c in islice(chunks, max_pending))
+                while pending:
+                    start, solutions = pending.popleft().result()
+                    for c in islice(chunks, 1):
+                        pending.append(pool.submit(_solve_chunk, *c, solve))
+                    yield from enumerate(solutions, start)
+            else:
+                pending = {pool.submit(_solve_chunk, *c, solve) for c in islice(chunks, max_pending)}
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    pending |= {pool.submit(_solve_chunk, *c, solve) for c in islice(chunks, len(done))}
+                    for f in done:
+                        start, solutions = f.result()
+                        yield from enumerate(solutions, start)
+    finally:
+        if shm is not None:
+            shm.close()
+            shm.unlink()
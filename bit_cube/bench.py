@@ -0,0 +1,73 @@
+"""
+Benchmarks for the integer representation of a 2x2 rubiks cube.
+
+Run with python -m bit_cube.bench
+"""
+
+from random import Random
+from timeit import timeit
+
+from . import manipulations
+from . import engine
+from .solver import Solver
+
+
+def turns_per_second(module, moves=10000, repeat=5, seed=0):
+    """
+    Measure the throughput of roll_str and rot_str of a module.
+
+    :param module: A module implementing roll_str and rot_str
+    :param moves: Number of single character moves timed per run
+    :param repeat: Number of runs, the fastest of which is reported
+    :returns: A dictionary of operations per second for roll and rot
+    """
+    rng = Random(seed)
+    rolls = [rng.choice("LlFfUu") for _ in range(moves)]
+    rots = [rng.choice("LlFfUu") for _ in range(moves)]
+    cube = manipulations.new_cube()
+
+    def run(fn, seq):
+        c = cube
+        for i in seq:
+            c = fn(c, i)
+
+    ret = {}
+    for name, fn, seq in (("roll", module.roll_str, rolls), ("rot", module.rot_str, rots)):
+        ret[name] = moves / min(timeit(lambda: run(fn, seq), number=1) for _ in range(repeat))
+    return ret
+
+def generated_nodes(depths=range(1, 9), seed=0):
+    """
+    Count the nodes generated by the search with and without move pruning.
+
+    :param depths: Lengths of the random scrambles solved
+    :returns: A dictionary of the pair of counts without and with pruning for every depth
+    """
+    rng = Random(seed)
+    ret = {}
+    for depth in depths:
+        scramble = ""
+        while len(scramble) < depth:
+            # Avoid moves that cancel the previous one, so the scramble is not trivially shorter.
+            scramble += rng.choice([m for m in "LlFfUu" if not scramble or m != scramble[-1].swapcase()])
+        cube = engine.roll_str(manipulations.new_cube(), scramble)
+        counts = []
+        for prune in (False, True):
+            solver = Solver(cube, prune=prune)
+            solver.solve()
+            counts.append(solver.generated)
+        ret[depth] = tuple(counts)
+    return ret
+
+
+def main():
+    before = turns_per_second(manipulations)
+    after = turns_per_second(engine)
+    for k in before:
+        print(f"{k:5}{before[k]:>14,.0f}/s -> {after[k]:>14,.0f}/s  ({after[k] / before[k]:.1f}x)")
+    print("depth  generated nodes without -> with pruning")
+    for depth, (before, after) in generated_nodes().items():
+        print(f"{depth:5}{before:>14,} -> {after:>14,}  ({1 - after / max(before, 1):.0%} fewer)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Parallel, resumable construction of the distance table.
+
+Like DistanceTable.build, the table is built by breadth first search from
+the solved cube over coordinates (see coord), which already identify the 24
+orientations of every state. The distances are held in a shared memory
+array, and every depth is split into shards of the coordinate space, each
+expanded by a worker process which writes the distance of the new states
+it reaches straight into the shared array. Workers only ever write the
+current depth into unknown entries, so concurrent writes to the same entry
+agree and need no locking.
+
+After every depth the array is written to a checkpoint file, from which an
+interrupted build resumes. The finished table is verified before it is
+saved: every state must be reached, the number of states at every depth
+must match the known totals of the 2x2 cube, and every state must be one
+move further than one of its neighbours and no nearer than any of them.
+
+Run with python -m bit_cube.build [--workers N] [--metric half] [path]
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import os
+import struct
+import zlib
+
+import numpy as np
+
+from .coord import N_STATES, N_TWIST, SOLVED, move_tables
+from .table import METRICS, UNKNOWN, DistanceTable, default_path
+
+# The number of states at every distance from the solved cube in each metric.
+HISTOGRAMS = {
+    "quarter": [1, 6, 27, 120, 534, 2256, 8969, 33058, 114149, 360508, 930588, 1350852, 782536, 90280, 276],
+    "half": [1, 9, 54, 321, 1847, 9992, 50136, 227536, 870072, 1887748, 623800, 2644],
+}
+
+# Layout of a checkpoint: magic, metric and the last complete depth, followed by the distances.
+CHECKPOINT = struct.Struct("<4sBB")
+CHECKPOINT_MAGIC = b"RBKC"
+
+# The distances and move tables of the worker processes, set by _init_worker.
+_shm = None
+_data = None
+_tables = None
+
+
+def _numpy_tables(metric):
+    return [(np.asarray(perm, dtype=np.int64), np.asarray(twist, dtype=np.int64))
+            for perm, twist in move_tables(METRICS[metric])]
+
+def _init_worker(name, metric):
+    global _shm, _data, _tables
+    _shm = shared_memory.SharedMemory(name)
+    _data = np.ndarray(N_STATES, dtype=np.uint8, buffer=_shm.buf)
+    _tables = _numpy_tables(metric)
+
+def expand_shard(data, tables, lo, hi, depth):
+    """
+    Write depth into the unknown neighbours of the states of a shard at the previous depth.
+
+    :param data: The distances being built
+    :param tables: The numpy move tables of the metric
+    :param lo: The first coordinate of the shard
+    :param hi: The coordinate after the last one of the shard
+    :returns: The number of states of the shard which were expanded
+    """
+    frontier = np.flatnonzero(data[lo:hi] == depth - 1) + lo
+    p, t = np.divmod(frontier, N_TWIST)
+    for perm, twist in tables:
+        n = perm[p] * N_TWIST + twist[t]
+        data[n[data[n] == UNKNOWN]] = depth
+    return len(frontier)
+
+def _expand_shard(lo, hi, depth):
+    return expand_shard(_data, _tables, lo, hi, depth)
+
+
+def save_checkpoint(path, data, metric, depth):
+    """Atomically write the distances known up to depth."""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(CHECKPOINT.pack(CHECKPOINT_MAGIC, list(METRICS).index(metric), depth))
+        f.write(data)
+    os.replace(tmp, path)
+
+def load_checkpoint(path, data, metric):
+    """
+    Read a checkpoint into data.
+
+    :returns: The last complete depth, or None if there is no valid checkpoint of the metric
+    """
+    try:
+        with open(path, "rb") as f:
+            magic, m, depth = CHECKPOINT.unpack(f.read(CHECKPOINT.size))
+            if magic != CHECKPOINT_MAGIC or m != list(METRICS).index(metric):
+                return None
+            if f.readinto(data) != N_STATES:
+                return None
+    except (OSError, struct.error):
+        return None
+    return depth
+
+
+def build(metric="quarter", workers=None, shards=None, checkpoint=None, log=None):
+    """
+    Build the distance table over a pool of processes.
+
+    :param workers: Number of processes, by default os.cpu_count()
+    :param shards: Number of shards every depth is split into, by default four per worker
+    :param checkpoint: An optional file the progress is saved to after every
+                       depth, and resumed from if it exists
+    :param log: An optional function called with the depth and number of states after every depth
+    :returns: The DistanceTable, holding a numpy array
+    """
+    workers = workers or os.cpu_count() or 1
+    shards = shards or 4 * workers
+    bounds = np.linspace(0, N_STATES, shards + 1, dtype=np.int64).tolist()
+    shm = shared_memory.SharedMemory(create=True, size=N_STATES)
+    data = np.ndarray(N_STATES, dtype=np.uint8, buffer=shm.buf)
+    try:
+        depth = load_checkpoint(checkpoint, data, metric) if checkpoint else None
+        if depth is None:
+            data[:] = UNKNOWN
+            data[SOLVED] = depth = 0
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(shm.name, metric)) as pool:
+            while True:
+                depth += 1
+                list(pool.map(_expand_shard, bounds[:-1], bounds[1:], [depth] * shards))
+                count = int(np.count_nonzero(data == depth))
+                if log is not None:
+                    log(depth, count)
+                if not count:
+                    break
+                if checkpoint:
+                    save_checkpoint(checkpoint, data, metric, depth)
+        ret = DistanceTable(data.copy(), metric)
+    finally:
+        # The view must be released before the segment can be closed.
+        del data
+        shm.close()
+        shm.unlink()
+    return ret
+
+
+def verify(table):
+    """
+    Check a table against the known properties of the 2x2 cube.
+
+    :returns: A list of descriptions of every problem found
+    """
+    data = np.frombuffer(table.data, dtype=np.uint8)
+    ret = []
+    if len(data) != N_STATES:
+        return [f"{len(data)} states instead of {N_STATES}"]
+    unknown = int(np.count_nonzero(data == UNKNOWN))
+    if unknown:
+        return [f"{unknown} states were not reached"]
+    histogram = table.histogram()
+    if histogram != HISTOGRAMS[table.metric]:
+        ret.append(f"histogram {histogram} differs from {HISTOGRAMS[table.metric]}")
+    if data[SOLVED] != 0:
+        ret.append("the solved cube is not at distance 0")
+    p, t = np.divmod(np.arange(N_STATES, dtype=np.int64), N_TWIST)
+    nearest = np.full(N_STATES, UNKNOWN, dtype=np.uint8)
+    for perm, twist in _numpy_tables(table.metric):
+        np.minimum(nearest, data[perm[p] * N_TWIST + twist[t]], out=nearest)
+    wrong = np.flatnonzero((nearest + 1 != data) & (data != 0))
+    if wrong.size:
+        ret.append(f"{wrong.size} states are not one move further than their nearest neighbour, such as {wrong[0]}")
+    return ret
+
+def checksum(table):
+    """Return the crc32 of the distances, as stored in the header of table files."""
+    return zlib.crc32(np.frombuffer(table.data, dtype=np.uint8))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and verify a 2x2 distance table over several processes.")
+    parser.add_argument("path", nargs="?", help="output file, defaults to the package directory")
+    parser.add_argument("--metric", choices=METRICS, default="quarter")
+    parser.add_argument("--workers", type=int, help="worker processes, by default one per cpu")
+    parser.add_argument("--shards", type=int, help="shards of every depth, by default four per worker")
+    parser.add_argument("--checkpoint", help="file the build is checkpointed to and resumed from, "
+                                             "by default the output file with a .ckpt suffix")
+    parser.add_argument("--no-checkpoint", dest="checkpoint", action="store_false")
+    args = parser.parse_args(argv)
+
+    path = args.path or default_path(args.metric)
+    checkpoint = path + ".ckpt" if args.checkpoint is None else args.checkpoint
+    table = build(args.metric, args.workers, args.shards, checkpoint,
+                  log=lambda depth, count: print(f"{depth:3}{count:>10}", flush=True))
+    problems = verify(table)
+    for p in problems:
+        print("error:", p)
+    if problems:
+        return 1
+    table.save(path)
+    if checkpoint and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    print(f"{N_STATES} states, crc32 {checksum(table):08x}, verified, written to {path}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
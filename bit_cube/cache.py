@@ -0,0 +1,188 @@
+"""
+A bounded cache of solutions in front of the solvers.
+
+Cubes are keyed by the coordinate of their canonical rotation (see symmetry
+and coord), so the 24 orientations of the same puzzle share one entry, and
+the cached solution is translated back to the orientation of every request.
+
+A cached solution also answers every state along its path: after the first
+k moves of a solution the rest of it solves the cube, so those states are
+indexed to the suffix of the entry instead of being solved again.
+
+The cache may be backed by a file, to which new entries are appended, and
+which is read back when the cache is created, so solutions survive restarts.
+The file is line buffered, so every entry is written as soon as it is added.
+"""
+
+from collections import OrderedDict, namedtuple
+import os
+
+from .coord import MOVES, move, solvable, to_coord
+from .engine import rot_str
+from .solver import Solver
+from .symmetry import canonical_rotation, translate
+
+CacheInfo = namedtuple("CacheInfo", "hits suffix_hits misses evictions size maxsize")
+
+
+def _search(cube):
+    return Solver(cube, bidirectional=True).solve()
+
+
+class SolutionCache:
+    """
+    Solutions of canonical cubes, evicting the least recently used.
+
+    Besides the entries, up to one reference per move of every entry is
+    kept for the states along its solution.
+    """
+    def __init__(self, maxsize=65536, path=None, solver=_search):
+        """
+        :param maxsize: The number of solutions kept
+        :param path: An optional file backing the cache, created if missing
+        :param solver: A function returning the solution of a canonical cube,
+                       using only the moves of coord.MOVES, by default the
+                       bidirectional Solver
+        """
+        self.maxsize = maxsize
+        self.path = path
+        self.solver = solver
+        self.entries = OrderedDict()
+        # The coordinates of the states along every solution, mapped to the
+        # coordinate of the entry and the number of moves already made.
+        self.suffixes = {}
+        self.hits = self.suffix_hits = self.misses = self.evictions = 0
+        self._log = None
+        self._logged = 0
+        if path is not None:
+            self.load(path)
+            self._log = open(path, "a", buffering=1)
+            self._logged = len(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def cache_info(self):
+        """Return the statistics of the cache, see functools.lru_cache."""
+        return CacheInfo(self.hits, self.suffix_hits, self.misses, self.evictions, len(self.entries), self.maxsize)
+
+    def get(self, cube):
+        """
+        Read the solution of a cube from the cache.
+
+        :param cube: The integer representation of the cube
+        :returns: The string sequence of operations that solves the cube, or None if not cached
+        """
+        if not solvable(cube): return None
+        rotation = canonical_rotation(cube)
+        s = self.lookup(to_coord(rot_str(cube, rotation)))
+        return None if s is None else translate(s, rotation)
+
+    def solve(self, cube):
+        """
+        Find the solution of a cube, from the cache or by solving and caching it.
+
+        :param cube: The integer representation of the cube
+        :returns: The string sequence of operations that solves the cube,
+                  or None if the cube cannot be solved.
+        """
+        if not solvable(cube): return None
+        rotation = canonical_rotation(cube)
+        canonical = rot_str(cube, rotation)
+        key = to_coord(canonical)
+        s = self.lookup(key)
+        if s is None:
+            s = self.solver(canonical)
+            if s is None: return None
+            self.add(key, s)
+        return translate(s, rotation)
+
+    def lookup(self, key):
+        """Return the cached solution of the coordinate of a canonical cube, or None."""
+        s = self.entries.get(key)
+        if s is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return s
+        ref = self.suffixes.get(key)
+        if ref is not None:
+            head, k = ref
+            self.entries.move_to_end(head)
+            self.suffix_hits += 1
+            return self.entries[head][k:]
+        self.misses += 1
+        return None
+
+    def add(self, key, solution):
+        """
+        Cache the solution of the coordinate of a canonical cube.
+
+        :raises ValueError: If the solution holds moves other than coord.MOVES
+        """
+        if key in self.entries: return
+        if not set(solution) <= set(MOVES):
+            raise ValueError(f"solutions of canonical cubes only turn the faces of {MOVES}")
+        self.entries[key] = solution
+        for k, c in enumerate(self._path(key, solution), 1):
+            self.suffixes[c] = (key, k)
+        if self._log is not None:
+            self._log.write(f"{key} {solution}\n")
+            self._logged += 1
+        while len(self.entries) > self.maxsize:
+            self._evict()
+        # The file is compacted once evicted entries make up most of it.
+        if self._logged > 2 * self.maxsize:
+            self.save()
+
+    @staticmethod
+    def _path(key, solution):
+        """Yield the coordinates of the states after every prefix of a solution, but the last."""
+        c = key
+        for m in solution[:-1]:
+            c = move(c, m)
+            yield c
+
+    def _evict(self):
+        head, solution = self.entries.popitem(last=False)
+        self.evictions += 1
+        for c in self._path(head, solution):
+            if self.suffixes.get(c, (None,))[0] == head:
+                del self.suffixes[c]
+
+    def load(self, path):
+        """
+        Add the entries of a cache file, creating it if missing.
+
+        Entries are added in the order they were written, and the file is
+        rewritten without the entries evicted or written twice.
+        """
+        if not os.path.exists(path):
+            open(path, "w").close()
+            return
+        lines = 0
+        with open(path) as f:
+            for line in f:
+                key, _, solution = line.rstrip("\n").partition(" ")
+                self.add(int(key), solution)
+                lines += 1
+        if lines > len(self.entries):
+            self.save(path)
+
+    def save(self, path=None):
+        """Write the entries to a file, by default the backing file, from least to most recently used."""
+        path = self.path if path is None else path
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            for key, solution in self.entries.items():
+                f.write(f"{key} {solution}\n")
+        os.replace(tmp, path)
+        if self._log is not None and path == self.path:
+            self._log.close()
+            self._log = open(path, "a", buffering=1)
+            self._logged = len(self.entries)
+
+    def close(self):
+        """Flush and close the backing file."""
+        if self._log is not None:
+            self._log.close()
+            self._log = None
@@ -0,0 +1,157 @@
+"""
+A client of the solve service, and a load generator measuring it.
+
+The load generator opens several connections, each keeping a number of
+requests in flight, and sends random scrambles drawn from a fixed seed.
+A fraction of the requests repeat earlier scrambles, as when many clients
+solve the same cube, to exercise the coalescing of the service. It reports
+the throughput, the latency percentiles and the final metrics of the service.
+
+Run with python -m bit_cube.client [--port 8642 | --unix PATH] [--requests 10000]
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import sys
+from time import perf_counter
+
+import numpy as np
+
+from .scramble import random_cubes
+from .service import PORT
+
+
+class Client:
+    """A connection to the solve service, which may send several requests concurrently."""
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.ids = itertools.count()
+        self.waiting = {}
+        self._reading = asyncio.create_task(self._read())
+
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=PORT, path=None):
+        """
+        Connect to a service.
+
+        :param path: The path of a Unix socket, connected to instead of host and port
+        """
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def _read(self):
+        try:
+            while line := await self.reader.readline():
+                response = json.loads(line)
+                future = self.waiting.pop(response.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        finally:
+            for future in self.waiting.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("connection closed"))
+
+    async def request(self, **fields):
+        """
+        Send a request and wait for its response.
+
+        :returns: The response as a dictionary
+        """
+        i = next(self.ids)
+        future = self.waiting[i] = asyncio.get_running_loop().create_future()
+        self.writer.write(json.dumps({"id": i, **fields}).encode() + b"\n")
+        await self.writer.drain()
+        return await future
+
+    async def solve(self, cube, deadline=None):
+        """
+        Solve the integer representation of a cube.
+
+        :raises RuntimeError: If the service answered with an error
+        :returns: The string sequence of operations that solves the cube.
+        """
+        fields = {"cube": cube} if deadline is None else {"cube": cube, "deadline": deadline}
+        response = await self.request(**fields)
+        if "error" in response:
+            raise RuntimeError(response["error"])
+        return response["solution"]
+
+    async def metrics(self):
+        """Return the counters of the service."""
+        return (await self.request(op="metrics"))["metrics"]
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        self._reading.cancel()
+
+
+async def load(requests=10000, connections=8, concurrency=16, repeat=0.2, deadline=None, seed=0,
+               host="127.0.0.1", port=PORT, path=None):
+    """
+    Send random cubes to a service and measure its latency.
+
+    :param requests: Number of requests sent in total
+    :param connections: Number of connections
+    :param concurrency: Number of requests in flight per connection
+    :param repeat: Fraction of requests repeating the cube of a previous request
+    :param deadline: The deadline of every request in seconds, or None
+    :returns: A JSON serializable dictionary of the results
+    """
+    rng = np.random.default_rng(seed)
+    cubes = random_cubes(requests, rng)
+    repeats = rng.random(requests) < repeat
+    for i in np.flatnonzero(repeats[1:]) + 1:
+        cubes[i] = cubes[rng.integers(i)]
+    queue = iter(cubes)
+    latencies, errors = [], {}
+
+    async def worker(client):
+        for cube in queue:
+            start = perf_counter()
+            response = await client.request(**({"cube": cube} if deadline is None else
+                                               {"cube": cube, "deadline": deadline}))
+            latencies.append(perf_counter() - start)
+            if "error" in response:
+                errors[response["error"]] = errors.get(response["error"], 0) + 1
+
+    clients = [await Client.connect(host, port, path) for _ in range(connections)]
+    start = perf_counter()
+    await asyncio.gather(*(worker(c) for c in clients for _ in range(concurrency)))
+    seconds = perf_counter() - start
+    metrics = await clients[0].metrics()
+    for c in clients:
+        await c.close()
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]).tolist()
+    return {"requests": requests, "seconds": seconds, "throughput": requests / seconds,
+            "p50": p50, "p95": p95, "p99": p99, "max": max(latencies), "errors": errors,
+            "metrics": metrics}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate load on the solve service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--unix", metavar="PATH", help="connect to a Unix socket instead of TCP")
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--connections", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=16, help="requests in flight per connection")
+    parser.add_argument("--repeat", type=float, default=0.2, help="fraction of repeated cubes")
+    parser.add_argument("--deadline", type=float, help="deadline of every request in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(load(args.requests, args.connections, args.concurrency, args.repeat, args.deadline,
+                               args.seed, args.host, args.port, args.unix))
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Lossless conversions between the three representations of a 2x2 rubiks cube.
+
+object_cube.cube.Cube holds a 6x2x2 array of ANSI color strings, array_cube
+a 6x2x2 int8 array of color codes, and bit_cube a 96-bit integer of 4-bit
+color codes. All three unwrap the cube in the same face order (L, F, R, B,
+U, D) and turn it with the same move letters, so a move string solving a cube
+in one representation solves its conversion in any other.
+
+object_cube and array_cube also lay out the tiles of a face identically.
+bit_cube stores face f in nibbles 4*(5-f) to 4*(5-f)+3, with the upper left,
+upper right, lower left and lower right tiles in nibbles 3, 2, 0 and 1.
+array_cube and bit_cube share their color codes. Facelet strings spell the
+colors of the tiles in the order of array_cube, one letter per tile.
+
+Run python -m bit_cube.convert to check that every move and rotation gives
+the same state in all three representations.
+"""
+
+from random import Random
+
+import numpy as np
+
+from array_cube import manipulations as _array
+from object_cube.cube import Cube
+from . import engine as _bit
+from .manipulations import dir_map
+
+# NIBBLES[i] is the nibble of a bit cube holding tile i of a flattened array cube.
+NIBBLES = tuple(4*(5 - f) + (3, 2, 0, 1)[t] for f in range(6) for t in range(4))
+_NIBBLES = np.array(NIBBLES, dtype=np.uint64)
+
+# The object_cube color of every color code.
+OBJECT_COLORS = np.array([Cube.ORANGE, Cube.GREEN, Cube.RED, Cube.YELLOW, Cube.WHITE, Cube.BLUE])
+_CODES = {c: i for i, c in enumerate(OBJECT_COLORS.tolist())}
+# The FastCube color code, which is the digit of Cube.hash_state, of every color code.
+FAST_COLORS = bytes(int(Cube.color_map[c]) for c in OBJECT_COLORS.tolist())
+_FAST_CODES = bytes(FAST_COLORS.index(i) for i in range(6))
+# The letter of every color code in facelet strings, such as "OOOOGGGGRRRRYYYYWWWWBBBB" for the solved cube.
+FACELETS = "".join(c.name[0] for c in _array.Color)
+
+
+def _check_codes(codes):
+    codes = np.asarray(codes)
+    if codes.shape[-3:] != (6, 2, 2) and codes.shape[-1:] != (24,):
+        raise ValueError(f"expected cubes of 24 tiles, got shape {codes.shape}")
+    if codes.size and (codes.min() < 0 or codes.max() > 5):
+        raise ValueError("color codes must be in [0, 6)")
+    return codes
+
+
+def array_to_bit(cube):
+    """
+    Convert an array_cube cube to a bit_cube cube.
+
+    :param cube: A 6x2x2 or flattened array of color codes
+    :returns: An integer representing the cube
+    :raises ValueError: If cube is not an array of 24 color codes
+    """
+    flat = _check_codes(cube).ravel().tolist()
+    return sum(c << 4*n for c, n in zip(flat, NIBBLES))
+
+def bit_to_array(cube):
+    """
+    Convert a bit_cube cube to an array_cube cube.
+
+    :param cube: An integer representing the cube
+    :returns: A 6x2x2 int8 array of color codes
+    :raises ValueError: If cube has bits outside of its 24 tiles or an invalid color code
+    """
+    if cube < 0 or cube >> 96:
+        raise ValueError("cube must be a 96-bit integer")
+    return _check_codes(np.array([(cube >> 4*n) & 0b1111 for n in NIBBLES], dtype=np.int8)).reshape(6, 2, 2)
+
+def object_to_array(cube):
+    """
+    Convert an object_cube Cube or FastCube to an array_cube cube.
+
+    :returns: A 6x2x2 int8 array of color codes
+    :raises ValueError: If a tile is not a color of Cube
+    """
+    if isinstance(cube.array, bytearray):
+        return np.array([_FAST_CODES[c] for c in cube.array], dtype=np.int8).reshape(6, 2, 2)
+    try:
+        return np.array([_CODES[c] for c in cube.array.ravel().tolist()], dtype=np.int8).reshape(6, 2, 2)
+    except KeyError as e:
+        raise ValueError(f"unknown tile color {e.args[0]!r}") from None
+
+def array_to_object(cube, cls=Cube):
+    """
+    Convert an array_cube cube to an object_cube Cube or FastCube.
+
+    :param cube: A 6x2x2 or flattened array of color codes
+    :param cls: Cube or FastCube
+    """
+    codes = _check_codes(cube).reshape(6, 2, 2)
+    ret = cls()
+    if isinstance(ret.array, bytearray):
+        ret.array = bytearray(FAST_COLORS[c] for c in codes.ravel().tolist())
+    else:
+        ret.array = OBJECT_COLORS[codes]
+    return ret
+
+def object_to_bit(cube):
+    """Convert an object_cube Cube or FastCube to a bit_cube cube."""
+    return array_to_bit(object_to_array(cube))
+
+def bit_to_object(cube, cls=Cube):
+    """Convert a bit_cube cube to an object_cube Cube or FastCube."""
+    return array_to_object(bit_to_array(cube), cls)
+
+
+def facelets_to_bit(string):
+    """
+    Convert a facelet string to a bit_cube cube.
+
+    :param string: The 24 colors of the tiles of a flattened array cube,
+                   as the first letters of their names, see FACELETS
+    :returns: An integer representing the cube
+    :raises ValueError: If string is not 24 color letters, four of each color
+    """
+    string = string.upper()
+    if len(string) != 24 or any(string.count(c) != 4 for c in FACELETS):
+        raise ValueError(f"expected 24 facelets, four of each of {FACELETS}")
+    return sum(FACELETS.index(c) << 4*n for c, n in zip(string, NIBBLES))
+
+def bit_to_facelets(cube):
+    """Convert a bit_cube cube to a facelet string, see facelets_to_bit."""
+    return "".join(FACELETS[c] for c in bit_to_array(cube).ravel().tolist())
+
+
+def arrays_to_bits(cubes):
+    """
+    Convert a stack of array_cube cubes to bit_cube cubes.
+
+    The tiles are packed into two 48-bit halves with numpy,
+    and only the final join is done per cube.
+
+    :param cubes: A (N, 6, 2, 2) or (N, 24) array of color codes
+    :returns: A list of N integers
+    """
+    flat = _check_codes(cubes).reshape(len(cubes), 24).astype(np.uint64)
+    packed = flat << (np.uint64(4) * (_NIBBLES % np.uint64(12)))
+    low = np.bitwise_or.reduce(np.where(_NIBBLES < 12, packed, np.uint64(0)), axis=1)
+    high = np.bitwise_or.reduce(np.where(_NIBBLES >= 12, packed, np.uint64(0)), axis=1)
+    return [(h << 48) | l for h, l in zip(high.tolist(), low.tolist())]
+
+def bits_to_arrays(cubes):
+    """
+    Convert a sequence of bit_cube cubes to a stack of array_cube cubes.
+
+    :param cubes: A sequence of N integers
+    :returns: A (N, 6, 2, 2) int8 array of color codes
+    :raises ValueError: If a cube has bits outside of its 24 tiles or an invalid color code
+    """
+    if any(c < 0 or c >> 96 for c in cubes):
+        raise ValueError("cubes must be 96-bit integers")
+    halves = np.array([(c & (1 << 48) - 1, c >> 48) for c in cubes], dtype=np.uint64).reshape(-1, 2)
+    words = halves[:, (_NIBBLES >= 12).astype(np.intp)]
+    codes = (words >> (np.uint64(4) * (_NIBBLES % np.uint64(12)))) & np.uint64(0b1111)
+    return _check_codes(codes.astype(np.int8)).reshape(-1, 6, 2, 2)
+
+def objects_to_arrays(cubes):
+    """Convert a sequence of object_cube Cubes or FastCubes to a (N, 6, 2, 2) stack of array_cube cubes."""
+    return np.array([object_to_array(c) for c in cubes], dtype=np.int8).reshape(-1, 6, 2, 2)
+
+
+def conformance(n=100, depth=20, seed=0):
+    """
+    Check that every representation agrees on the result of every operation.
+
+    Every roll and rotation is applied to n random cubes in each
+    representation, and the results are converted to arrays and compared.
+    Conversions are also checked to round trip.
+
+    :param n: Number of random cubes
+    :param depth: Number of random moves scrambling every cube
+    :returns: A list of (scramble, operation, representation) of every mismatch
+    """
+    # FastCube is only needed here, and object_cube.fast imports this module.
+    from object_cube.fast import FastCube
+    rng = Random(seed)
+    failures = []
+    for _ in range(n):
+        scramble = "".join(rng.choice(list(dir_map)) for _ in range(depth))
+        array = _array.roll_str(_array.new_cube(), scramble)
+        if not np.array_equal(bit_to_array(array_to_bit(array)), array):
+            failures.append((scramble, "", "bit round trip"))
+        for cls in (Cube, FastCube):
+            if not np.array_equal(object_to_array(array_to_object(array, cls)), array):
+                failures.append((scramble, "", f"{cls.__name__} round trip"))
+        ops = [(k, _array.roll_str, _bit.roll_str, "roll_str") for k in dir_map]
+        ops += [(k, _array.rot_str, _bit.rot_str, "rot_str") for k in "LlFfUu"]
+        for k, array_op, bit_op, method in ops:
+            expected = array_op(array, k)
+            results = {"bit_cube": bit_to_array(bit_op(array_to_bit(array), k))}
+            for cls in (Cube, FastCube):
+                c = array_to_object(array, cls)
+                getattr(c, method)(k)
+                results[cls.__name__] = object_to_array(c)
+            failures += [(scramble, f"{method}({k})", name)
+                         for name, r in results.items() if not np.array_equal(r, expected)]
+    return failures
+
+def main():
+    failures = conformance()
+    for scramble, op, name in failures:
+        print(f"{name} differs after {op or 'conversion'} of {scramble}")
+    print("ok" if not failures else f"{len(failures)} mismatches")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
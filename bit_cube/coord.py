@@ -0,0 +1,278 @@
+"""
+Coordinate encoding of the integer representation of a 2x2 rubiks cube.
+
+A 2x2 cube is fully described by the positions and twists of its 8 corners.
+The L, F and U turns never move the down-back-right corner, so a cube with
+that corner fixed is determined by the permutation of the other 7 corners
+and the twists of 6 of them, the last twist being implied by the other six.
+
+Every such cube maps to a dense integer coordinate
+
+    perm * N_TWIST + twist
+
+in [0, N_STATES), where perm is the rank of the corner permutation in [0, 7!)
+and twist is the base 3 number formed by the first 6 twists in [0, 3^6).
+The solved cube is coordinate 0, so states can index flat arrays directly.
+"""
+
+from array import array
+from math import factorial
+
+from .manipulations import NEW, dir_map
+from .engine import ROLL_PERMS, ROT_STR_NETWORKS, apply_network
+
+# Tile positions of each corner, with the tile on the upward or downward
+# face first and the remaining tiles in a consistent cyclic order.
+CORNERS = ((0, 9, 20), (1, 13, 8), (2, 17, 12), (3, 21, 16),
+           (4, 19, 22), (5, 15, 18), (6, 11, 14), (7, 23, 10))
+FIXED = 1
+FREE = tuple(i for i in range(len(CORNERS)) if i != FIXED)
+
+MOVES = "LlFfUu"
+
+N_PERM = factorial(len(FREE))
+N_TWIST = 3 ** (len(FREE) - 1)
+N_STATES = N_PERM * N_TWIST
+SOLVED = 0
+
+
+def _tile(cube, i):
+    return (cube >> 4*i) & 0b1111
+
+CORNER_COLORS = tuple(tuple(_tile(NEW, i) for i in c) for c in CORNERS)
+_CUBIE = {frozenset(c): k for k, c in enumerate(CORNER_COLORS)}
+_FACE_COLORS = frozenset(c[0] for c in CORNER_COLORS)
+
+
+def read_corners(cube):
+    """
+    Read the corner permutation and twists of a cube.
+
+    :returns: A pair of lists, the corner occupying each corner position
+              and the twist of each corner
+    :raises ValueError: If a corner position holds an invalid set of colors
+    """
+    perm = []
+    twist = []
+    for c in CORNERS:
+        colors = tuple(_tile(cube, i) for i in c)
+        try:
+            perm.append(_CUBIE[frozenset(colors)])
+        except KeyError:
+            raise ValueError(f"invalid corner colors {colors}") from None
+        twist.append(next(i for i, x in enumerate(colors) if x in _FACE_COLORS))
+    return perm, twist
+
+def solvable(cube):
+    """
+    Return whether a cube can be solved by turning its faces.
+
+    Every corner position must hold a distinct corner, and the twists of
+    the corners must add up to a multiple of 3, which no turn changes.
+    """
+    try:
+        perm, twist = read_corners(cube)
+    except ValueError:
+        return False
+    return len(set(perm)) == len(perm) and sum(twist) % 3 == 0
+
+def write_corners(perm, twist):
+    """
+    Build a cube from a corner permutation and twists.
+
+    :param perm: The corner occupying each of the 8 corner positions
+    :param twist: The twist of each of the 8 corners
+    :returns: The integer representation of the cube
+    """
+    cube = 0
+    for c, k, t in zip(CORNERS, perm, twist):
+        colors = CORNER_COLORS[k]
+        for s, i in enumerate(c):
+            cube |= colors[(s - t) % 3] << 4*i
+    return cube
+
+
+def encode_perm(perm):
+    """Rank a permutation of range(n) in [0, n!)."""
+    ret = 0
+    for i, x in enumerate(perm):
+        ret = ret * (len(perm) - i) + sum(1 for y in perm[i+1:] if y < x)
+    return ret
+
+def decode_perm(i, n=len(FREE)):
+    """Return the permutation of range(n) with rank i."""
+    digits = []
+    for base in range(1, n + 1):
+        digits.append(i % base)
+        i //= base
+    pool = list(range(n))
+    return [pool.pop(d) for d in reversed(digits)]
+
+def encode_twist(twist):
+    """Encode all but the last of a list of twists as a base 3 number."""
+    ret = 0
+    for t in twist[:-1]:
+        ret = ret * 3 + t
+    return ret
+
+def decode_twist(i, n=len(FREE)):
+    """Return the n twists encoded by i, the last of which makes the total a multiple of 3."""
+    twist = []
+    for _ in range(n - 1):
+        twist.append(i % 3)
+        i //= 3
+    twist.reverse()
+    twist.append(-sum(twist) % 3)
+    return twist
+
+
+_RANK = {k: i for i, k in enumerate(FREE)}
+
+def to_coord(cube):
+    """
+    Return the coordinate of a cube.
+
+    :raises ValueError: If the cube is not solvable, see solvable, or if the
+                        down-back-right corner is not in its solved position
+                        and orientation, see symmetry.canonical and recolor.
+    """
+    perm, twist = read_corners(cube)
+    # The last twist and the fixed corner are not encoded, so an unsolvable
+    # cube would otherwise share the coordinate of a solvable one.
+    if len(set(perm)) != len(perm) or sum(twist) % 3:
+        raise ValueError("the cube is not solvable")
+    if perm[FIXED] != FIXED or twist[FIXED] != 0:
+        raise ValueError("the fixed corner is not solved")
+    p = encode_perm([_RANK[perm[i]] for i in FREE])
+    t = encode_twist([twist[i] for i in FREE])
+    return p * N_TWIST + t
+
+def from_coord(coord):
+    """Return the integer representation of the cube with a coordinate."""
+    p, t = divmod(coord, N_TWIST)
+    perm = [FIXED] * len(CORNERS)
+    twist = [0] * len(CORNERS)
+    for i, k, x in zip(FREE, decode_perm(p), decode_twist(t)):
+        perm[i] = FREE[k]
+        twist[i] = x
+    return write_corners(perm, twist)
+
+
+# Whole cube rotations reaching each of the 24 orientations of a cube,
+# in the same order as the final states of the solvers.
+ORIENTATIONS = tuple(i + "U"*j for i in ["", "L", "l", "F", "f", "LL"] for j in range(4))
+
+def _build_recolor_maps():
+    """
+    Map the colors of the fixed corner in each orientation of the solved cube
+    to the color permutation that turns that orientation back into NEW.
+    """
+    maps = {}
+    for o in ORIENTATIONS:
+        c = NEW
+        for i in o:
+            c = apply_network(c, ROT_STR_NETWORKS[i])
+        colors = [0] * 16
+        for i in range(24):
+            colors[_tile(c, i)] = _tile(NEW, i)
+        maps[tuple(_tile(c, i) for i in CORNERS[FIXED])] = colors
+    return maps
+
+_RECOLOR = _build_recolor_maps()
+
+def recolor(cube):
+    """
+    Recolor a cube so that its down-back-right corner is solved.
+
+    Unlike symmetry.canonical, the tiles stay in place and only their colors change,
+    so any sequence of roll operations solving the recolored cube also
+    solves the original cube into the orientation given by that corner.
+
+    :raises ValueError: If the down-back-right corner is not a valid corner
+    """
+    key = tuple(_tile(cube, i) for i in CORNERS[FIXED])
+    try:
+        colors = _RECOLOR[key]
+    except KeyError:
+        raise ValueError(f"invalid corner colors {key}") from None
+    ret = 0
+    for i in range(24):
+        ret |= colors[_tile(cube, i)] << 4*i
+    return ret
+
+
+def _corner_move(p):
+    """
+    Express a tile permutation as a permutation and twist of the corners.
+
+    :returns: A pair of lists, the source position of the corner moved into
+              every position and the twist added to the corner on the way
+    """
+    src = []
+    delta = []
+    for c in CORNERS:
+        tiles = [p[i] for i in c]
+        k = next(k for k, d in enumerate(CORNERS) if tiles[0] in d)
+        src.append(k)
+        delta.append(-CORNERS[k].index(tiles[0]) % 3)
+    return src, delta
+
+def _build_move_tables():
+    perm_move = {}
+    twist_move = {}
+    for m in MOVES:
+        face, direction = dir_map[m]
+        src, delta = _corner_move(ROLL_PERMS[face][direction % 4])
+        assert src[FIXED] == FIXED and delta[FIXED] == 0
+        # Restrict the move to the free corners, ranked 0 to 6.
+        src = [_RANK[src[i]] for i in FREE]
+        delta = [delta[i] for i in FREE]
+
+        table = array('H', bytes(2 * N_PERM))
+        for i in range(N_PERM):
+            perm = decode_perm(i)
+            table[i] = encode_perm([perm[j] for j in src])
+        perm_move[m] = table
+
+        table = array('H', bytes(2 * N_TWIST))
+        for i in range(N_TWIST):
+            twist = decode_twist(i)
+            table[i] = encode_twist([(twist[j] + d) % 3 for j, d in zip(src, delta)])
+        twist_move[m] = table
+    return perm_move, twist_move
+
+PERM_MOVE, TWIST_MOVE = _build_move_tables()
+
+
+def move_tables(moves):
+    """
+    Return the move tables of a sequence of moves.
+
+    :param moves: Strings of characters in MOVES, each applied as a single move
+    :returns: A list of pairs of the permutation and twist move tables of each move
+    """
+    ret = []
+    for m in moves:
+        perm = array('H', range(N_PERM))
+        twist = array('H', range(N_TWIST))
+        for i in m:
+            perm = array('H', (PERM_MOVE[i][x] for x in perm))
+            twist = array('H', (TWIST_MOVE[i][x] for x in twist))
+        ret.append((perm, twist))
+    return ret
+
+def move(coord, m):
+    """
+    Perform a roll operation on a coordinate.
+
+    :param m: One of the characters in MOVES
+    :returns: The coordinate of the cube after the roll operation
+    """
+    p, t = divmod(coord, N_TWIST)
+    return PERM_MOVE[m][p] * N_TWIST + TWIST_MOVE[m][t]
+
+def move_str(coord, string):
+    """Perform a sequence of roll operations on a coordinate, see roll_str."""
+    for m in string:
+        coord = move(coord, m)
+    return coord
@@ -0,0 +1,270 @@
+"""
+Table driven move engine for the integer representation of a 2x2 rubiks cube.
+
+Every face turn and whole cube rotation is a fixed permutation of the 24
+4-bit tiles of the cube. The permutations are extracted once per process
+from the reference implementations in manipulations, and each one is compiled
+into a short network of (mask, shift) pairs, so that a turn costs a handful of
+integer operations instead of a chain of bit_swap and bit_roll calls.
+
+roll, roll_str, rot and rot_str are drop-in replacements for the functions of
+the same name in manipulations. Move strings are compiled by a MoveCompiler
+into a single cached permutation, so a long sequence costs about as much as
+a single move once compiled.
+"""
+
+from functools import lru_cache
+from math import lcm
+
+from . import manipulations as _ref
+from .manipulations import Man, dir_map
+
+TILES = 24
+IDENTITY = tuple(range(TILES))
+
+
+def tile_perm(fn):
+    """
+    Extract the tile permutation performed by a function on a cube.
+
+    The returned permutation p maps every tile to its source,
+    so that tile i of fn(cube) is tile p[i] of cube.
+
+    :param fn: A function taking and returning an integer cube
+    :returns: A tuple of 24 integers representing the permutation
+    """
+    # Every tile is tagged with half of its index, and the high bit
+    # of each tile is set so no tile is ever mistaken for padding.
+    low = sum((8 | (i & 7)) << 4*i for i in range(TILES))
+    high = sum((8 | (i >> 3)) << 4*i for i in range(TILES))
+    low, high = fn(low), fn(high)
+    return tuple(((low >> 4*i) & 7) | (((high >> 4*i) & 7) << 3) for i in range(TILES))
+
+def compose(*perms):
+    """
+    Compose permutations in the order they are applied.
+
+    :returns: A permutation equivalent to applying each of perms in sequence
+    """
+    ret = IDENTITY
+    for p in perms:
+        ret = tuple(ret[i] for i in p)
+    return ret
+
+def inverse(p):
+    """Return the inverse of the permutation p."""
+    ret = [0] * len(p)
+    for i, j in enumerate(p):
+        ret[j] = i
+    return tuple(ret)
+
+def power(p, n):
+    """Return the permutation p applied n times. Negative n applies the inverse."""
+    if n < 0:
+        p, n = inverse(p), -n
+    return compose(*([p] * n))
+
+def compile_perm(p):
+    """
+    Compile a permutation into a network of masks and shifts.
+
+    Tiles that move by the same distance are grouped under a single mask,
+    so a permutation becomes one and, shift and or per distinct distance.
+
+    :returns: A pair of tuples of (mask, shift) pairs, for left and right shifts
+    """
+    groups = {}
+    for i, j in enumerate(p):
+        groups[4*(i - j)] = groups.get(4*(i - j), 0) | (0b1111 << 4*j)
+    left = tuple((m, s) for s, m in sorted(groups.items()) if s >= 0)
+    right = tuple((m, -s) for s, m in sorted(groups.items()) if s < 0)
+    return left, right
+
+def order(p):
+    """Return the number of times p must be applied to return to the identity."""
+    seen = set()
+    ret = 1
+    for i in range(len(p)):
+        n = 0
+        while i not in seen:
+            seen.add(i)
+            i = p[i]
+            n += 1
+        if n:
+            ret = lcm(ret, n)
+    return ret
+
+def normalize(string, moves=dir_map):
+    """
+    Simplify a move string without changing its effect.
+
+    Consecutive turns of the same face are merged into a clockwise turn,
+    a half turn or an anticlockwise turn, and are dropped if they cancel.
+
+    :param moves: The move characters allowed in string, every face turn by default
+    :raises ValueError: If string contains an unknown move
+    """
+    faces = []
+    for i in string:
+        if i not in moves:
+            raise ValueError(f"unknown move {i!r}")
+        face, direction = dir_map[i]
+        if faces and faces[-1][0] == i.upper():
+            faces[-1][1] += direction
+        else:
+            faces.append([i.upper(), direction])
+    return "".join({1: k, 2: k + k, 3: k.lower()}.get(d % 4, "") for k, d in faces)
+
+
+class MoveCompiler:
+    """
+    Compile move strings into single permutations, kept in a bounded LRU cache.
+
+    Strings are normalized before lookup, so equivalent spellings of an
+    algorithm share a cache entry. The engines of the array and object
+    representations build their own compiler from the same class.
+    """
+    def __init__(self, perms, build=tuple, maxsize=1024):
+        """
+        :param perms: A dict of the permutation of every move character
+        :param build: A function converting a composed permutation into
+                      the form that is cached and returned by compile
+        :param maxsize: The number of compiled strings kept in the cache
+        """
+        self.perms = perms
+        self.build = build
+        # Normalized strings map to the compiled permutations, and raw strings
+        # are cached separately so repeated lookups skip normalizing.
+        self._normalized = lru_cache(maxsize)(self._build)
+        self._compile = lru_cache(maxsize)(lambda string: self._normalized(normalize(string, self.perms)))
+
+    def _build(self, string):
+        return self.build(compose(*(self.perms[i] for i in string)))
+
+    def perm(self, string):
+        """
+        Return the permutation performed by a move string.
+
+        :raises ValueError: If string contains a move the compiler has no permutation for
+        """
+        return compose(*(self.perms[i] for i in normalize(string, self.perms)))
+
+    def compile(self, string):
+        """Return the compiled, cached permutation of a move string."""
+        return self._compile(string)
+
+    def inverse(self, string):
+        """Return the compiled permutation undoing a move string."""
+        return self.build(inverse(self.perm(string)))
+
+    def order(self, string):
+        """Return the number of times a move string must be repeated to return to the starting state."""
+        return order(self.perm(string))
+
+    def cache_info(self):
+        """Return the statistics of the cache of normalized strings, see functools.lru_cache."""
+        return self._normalized.cache_info()
+
+def apply_network(cube, network):
+    """Apply a compiled permutation network to a cube."""
+    left, right = network
+    ret = 0
+    for m, s in left:
+        ret |= (cube & m) << s
+    for m, s in right:
+        ret |= (cube & m) >> s
+    return ret
+
+def apply_perm(cube, p):
+    """Apply an uncompiled permutation to a cube."""
+    return apply_network(cube, compile_perm(p))
+
+
+def _build_tables():
+    """
+    Build the clockwise permutation of every face turn and rotation.
+
+    The reference engine only implements the L, F and U faces, and only
+    the clockwise direction reliably. Each opposite face is derived by
+    turning its opposing face anticlockwise and rotating the whole
+    cube clockwise along the same axis, and every other direction
+    is a power of the clockwise permutation.
+    """
+    roll_cw = {}
+    rot_cw = {}
+    for face, opposite in ((Man.L, Man.R), (Man.F, Man.B), (Man.U, Man.D)):
+        turn = tile_perm(lambda c: _ref.roll(c, face.value, 1))
+        whole = tile_perm(lambda c: _ref.rot(c, face.value, 1))
+        roll_cw[face.value] = turn
+        roll_cw[opposite.value] = inverse(compose(inverse(turn), whole))
+        rot_cw[face.value] = whole
+        rot_cw[opposite.value] = inverse(whole)
+
+    roll_perms = {f: tuple(power(p, d) for d in range(4)) for f, p in roll_cw.items()}
+    rot_perms = {f: tuple(power(p, d) for d in range(4)) for f, p in rot_cw.items()}
+    return roll_perms, rot_perms
+
+ROLL_PERMS, ROT_PERMS = _build_tables()
+ROLL_NETWORKS = {f: tuple(compile_perm(p) for p in ps) for f, ps in ROLL_PERMS.items()}
+ROT_NETWORKS = {f: tuple(compile_perm(p) for p in ps) for f, ps in ROT_PERMS.items()}
+
+ROT_STR_NETWORKS = {k: ROT_NETWORKS[f][d % 4] for k, (f, d) in dir_map.items()}
+
+ROLL_COMPILER = MoveCompiler({k: ROLL_PERMS[f][d % 4] for k, (f, d) in dir_map.items()}, compile_perm)
+ROT_COMPILER = MoveCompiler({k: ROT_PERMS[f][d % 4] for k, (f, d) in dir_map.items()}, compile_perm)
+
+
+def roll(cube, face, direction):
+    """
+    Perform a roll operation on a specific face of the rubiks cube.
+
+    See also roll_str, which is a simpler alternative to this function.
+
+    :param face: An integer that represents the face to be rotated
+    :param direction: The number of 90 degree clockwise rotations
+                      performed on the cube. Negative numbers
+                      represent anticlockwise rotations.
+    """
+    return apply_network(cube, ROLL_NETWORKS[face][direction % 4])
+
+def roll_str(cube, string):
+    """
+    Perform roll operations on the cube based on a sequence of characters in a string.
+
+    F, B, L, R, U, D represents a clockwise rotation to the Front, Back, Left, Right,
+    Upward, Downward faces of the cube respectively.
+    f, b, l, r, u, d represents an anticlockwise rotation to the front, back, left, right,
+    upward, downward faces of the cube respectively.
+
+    :param string: A string where each character represents a roll operation on the cube.
+                   Cannot contain any other characters other than the 12 specified above.
+    """
+    return apply_network(cube, ROLL_COMPILER.compile(string))
+
+def rot(cube, face, direction):
+    """
+    Rotate the cube 90 degrees in relation to one of the faces of the cube.
+
+    See also rot_str, which is a simpler alternative to this function
+
+    :param face: An integer representing a face which specifies
+                 the axis which the cube is rotated along
+    :param direction: The number of 90 degrees clockwise rotations performed
+                      on the cube. Negative numbers represent anticlockwise
+                      rotations.
+    """
+    return apply_network(cube, ROT_NETWORKS[face][direction % 4])
+
+def rot_str(cube, string):
+    """
+    Perform rotation operations on the cube based on a sequence of characters in a string.
+
+    U, L, F represents a clockwise rotation along the Upward, Leftward, Frontward faces of the
+    cube respectively.
+    u, l, f represents an anticlockwise rotation along the upward, leftward, frontward
+    faces of the cube respectively.
+
+    :param string: A string where each character represents a rotation operation on the cube.
+                   Cannot contain any other characters other than the 6 specified above.
+    """
+    return apply_network(cube, ROT_COMPILER.compile(string))
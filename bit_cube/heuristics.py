@@ -0,0 +1,85 @@
+"""
+Admissible heuristics for searches over the coordinates of a 2x2 rubiks cube.
+
+Each heuristic is called with the permutation and twist coordinates of a state
+(see coord) and returns a lower bound of the number of moves required to solve
+it, which never overestimates the real distance.
+"""
+
+from functools import lru_cache
+
+from .coord import N_PERM, N_TWIST, move_tables
+from .table import METRICS
+
+
+def pruning_table(tables, size):
+    """
+    Compute the distance to 0 of every value of a single coordinate.
+
+    :param tables: A move table of the coordinate for every move
+    :param size: The number of values of the coordinate
+    :returns: A bytearray of the distance of every value
+    """
+    dist = bytearray([0xff]) * size
+    dist[0] = 0
+    frontier = [0]
+    depth = 0
+    while frontier:
+        depth += 1
+        found = []
+        for i in frontier:
+            for t in tables:
+                n = t[i]
+                if dist[n] == 0xff:
+                    dist[n] = depth
+                    found.append(n)
+        frontier = found
+    return dist
+
+@lru_cache(maxsize=None)
+def perm_table(metric="quarter"):
+    """Return the pruning table of the corner permutation coordinate."""
+    return pruning_table([p for p, _ in move_tables(METRICS[metric])], N_PERM)
+
+@lru_cache(maxsize=None)
+def twist_table(metric="quarter"):
+    """Return the pruning table of the corner twist coordinate."""
+    return pruning_table([t for _, t in move_tables(METRICS[metric])], N_TWIST)
+
+
+class PermHeuristic:
+    """The number of moves required to solve the corner permutation, ignoring twists."""
+    def __init__(self, metric="quarter"):
+        self.table = perm_table(metric)
+
+    def __call__(self, perm, twist):
+        return self.table[perm]
+
+class TwistHeuristic:
+    """The number of moves required to solve the corner twists, ignoring positions."""
+    def __init__(self, metric="quarter"):
+        self.table = twist_table(metric)
+
+    def __call__(self, perm, twist):
+        return self.table[twist]
+
+class MaxHeuristic:
+    """The largest bound of several heuristics, which is also admissible."""
+    def __init__(self, *heuristics):
+        self.heuristics = heuristics
+
+    def __call__(self, perm, twist):
+        return max(h(perm, twist) for h in self.heuristics)
+
+class TableHeuristic:
+    """The exact distance read from a DistanceTable."""
+    def __init__(self, table):
+        self.table = table
+
+    def __call__(self, perm, twist):
+        return self.table.data[perm * N_TWIST + twist]
+
+
+def default_heuristic(metric="quarter"):
+    """Return the combined permutation and twist heuristic."""
+    return MaxHeuristic(PermHeuristic(metric), TwistHeuristic(metric))
@@ -0,0 +1,157 @@
+"""
+Optional instrumentation of the searches of the solvers.
+
+Solvers accept an observer, which is notified when a solve starts, after
+every depth of the search and when the solve finishes. Observers are only
+called between depths, never per node, and a solver without an observer
+skips the bookkeeping entirely, so instrumentation costs nothing unless used.
+
+SearchStats records every depth for later inspection, and LogObserver emits
+one JSON record per event through the logging module, to be scraped.
+"""
+
+import json
+import logging
+import sys
+from collections import namedtuple
+from time import perf_counter
+
+# Statistics of one depth of a search.
+#   depth:      The depth of the expanded states, or the bound of an iteration of IDA*
+#   expanded:   The number of states whose successors were generated
+#   generated:  The number of successors generated
+#   duplicates: The number of successors which had already been visited
+#   frontier:   The number of new states, to be expanded at the next depth
+#   visited:    The number of states visited so far
+#   seconds:    The wall time spent on the depth
+#   memory:     An estimate of the bytes held by the search structures
+LevelStats = namedtuple("LevelStats", "depth expanded generated duplicates frontier visited seconds memory")
+
+
+def estimate_memory(*objects):
+    """
+    Estimate the bytes held by containers of a search, without walking every item.
+
+    Dictionaries and lists are assumed to hold items of the size of their first one.
+    """
+    ret = 0
+    for o in objects:
+        ret += sys.getsizeof(o)
+        if isinstance(o, dict) and o:
+            k, v = next(iter(o.items()))
+            ret += len(o) * (_item_size(k) + _item_size(v))
+        elif isinstance(o, list) and o:
+            ret += len(o) * _item_size(o[0])
+        elif hasattr(o, "nbytes"):
+            ret += o.nbytes - min(o.nbytes, sys.getsizeof(o))
+    return ret
+
+def _item_size(o):
+    if isinstance(o, tuple):
+        return sys.getsizeof(o) + sum(sys.getsizeof(i) for i in o)
+    return sys.getsizeof(o)
+
+
+class Observer:
+    """The interface of search observers, whose methods do nothing by default."""
+    def on_start(self, solver, method):
+        """Called when solver starts a search, method naming the search used."""
+
+    def on_level(self, solver, level):
+        """Called with the LevelStats of every depth of the search."""
+
+    def on_finish(self, solver, solution):
+        """Called with the solution, or None, when the search ends."""
+
+class ObserverGroup(Observer):
+    """Forward every event to several observers."""
+    def __init__(self, *observers):
+        self.observers = observers
+
+    def on_start(self, solver, method):
+        for o in self.observers: o.on_start(solver, method)
+
+    def on_level(self, solver, level):
+        for o in self.observers: o.on_level(solver, level)
+
+    def on_finish(self, solver, solution):
+        for o in self.observers: o.on_finish(solver, solution)
+
+class SearchStats(Observer):
+    """
+    Record the statistics of every depth of the searches of a solver.
+
+    The same instance may observe several solves, in which case
+    levels holds the depths of the last one.
+    """
+    def __init__(self):
+        self.method = None
+        self.levels = []
+        self.solution = None
+        self.seconds = 0.0
+        self._start = None
+
+    def on_start(self, solver, method):
+        self.method = method
+        self.levels = []
+        self.solution = None
+        self._start = perf_counter()
+
+    def on_level(self, solver, level):
+        self.levels.append(level)
+
+    def on_finish(self, solver, solution):
+        self.solution = solution
+        self.seconds = perf_counter() - self._start
+
+    @property
+    def generated(self):
+        return sum(l.generated for l in self.levels)
+
+    @property
+    def expanded(self):
+        return sum(l.expanded for l in self.levels)
+
+    @property
+    def duplicates(self):
+        return sum(l.duplicates for l in self.levels)
+
+    @property
+    def peak_memory(self):
+        return max((l.memory for l in self.levels), default=0)
+
+    def as_dict(self):
+        """Return the statistics as a JSON serializable dictionary."""
+        return {"method": self.method, "solution": self.solution, "seconds": self.seconds,
+                "generated": self.generated, "expanded": self.expanded, "duplicates": self.duplicates,
+                "peak_memory": self.peak_memory, "levels": [l._asdict() for l in self.levels]}
+
+class LogObserver(Observer):
+    """
+    Emit every event as a single line JSON record through a logger.
+
+    Records hold an "event" key of "start", "level" or "finish", the
+    class name and id of the solver, and the fields of the event.
+    """
+    def __init__(self, logger=None, level=logging.INFO):
+        """
+        :param logger: The logging.Logger records are emitted to,
+                       by default the "rubiks.solver" logger
+        :param level: The logging level of the records
+        """
+        self.logger = logging.getLogger("rubiks.solver") if logger is None else logger
+        self.level = level
+
+    def emit(self, solver, event, **fields):
+        if self.logger.isEnabledFor(self.level):
+            record = {"event": event, "solver": type(solver).__name__, "id": id(solver), **fields}
+            self.logger.log(self.level, json.dumps(record))
+
+    def on_start(self, solver, method):
+        self.emit(solver, "start", method=method)
+
+    def on_level(self, solver, level):
+        self.emit(solver, "level", **level._asdict())
+
+    def on_finish(self, solver, solution):
+        self.emit(solver, "finish", solution=solution)
@@ -0,0 +1,214 @@
+"""
+Parallel level synchronous breadth first search over coordinates.
+
+The states of the search are the coordinates of the recolored cube (see
+coord), sharded across worker processes by coordinate modulo the number of
+workers. At every depth, each worker expands its own shard of the frontier
+with numpy versions of the move tables and sends every successor to the
+worker owning it. Each worker then deduplicates what it received against
+its shard of the visited states, which become its shard of the next frontier.
+
+Like solve_compact, visited states store the index of the move reaching them
+instead of their parent, one byte per owned coordinate, and the path is
+rebuilt backwards by asking the owner of every state for that move.
+
+As soon as a worker generates the solved cube it signals the others, which
+stop expanding, and the search ends after that depth.
+
+Run python -m bit_cube.parallel [--workers 1,2,4,8,16] to benchmark the
+scaling of the search with the number of workers.
+"""
+
+import argparse
+from multiprocessing import Event, Pipe, Process, Queue
+import os
+from time import perf_counter
+
+import numpy as np
+
+from .coord import MOVES, N_STATES, N_TWIST, SOLVED, move, move_tables
+from .instrument import LevelStats
+from .table import default_path, open_table
+
+# The value stored for the start of the search, other states storing their move index plus one.
+START = len(MOVES) + 1
+
+
+def _expand(frontier, tables, found):
+    """
+    Generate the successors of a frontier, as their coordinate times 8 plus the index of the move reaching them.
+
+    :returns: The successors, the number generated, and the state and move index reaching
+              the solved cube if it was generated, otherwise None
+    """
+    p, t = np.divmod(frontier, N_TWIST)
+    ret = []
+    for i, (perm, twist) in enumerate(tables):
+        if found.is_set():
+            break
+        n = perm[p] * N_TWIST + twist[t]
+        hit = np.flatnonzero(n == SOLVED)
+        if hit.size:
+            found.set()
+            return np.empty(0, np.int64), sum(map(len, ret)) + len(n), (int(frontier[hit[0]]), i)
+        ret.append(n * 8 + i)
+    ret = np.concatenate(ret) if ret else np.empty(0, np.int64)
+    return ret, len(ret), None
+
+def _worker(rank, size, conn, inboxes, found):
+    """
+    Serve the commands of a ParallelSearch for the shard of the coordinates equal to rank modulo size.
+
+    Commands are ("start", coord), ("level", None), ("move", coord) and ("stop", None).
+    """
+    tables = [(np.asarray(perm, dtype=np.int64), np.asarray(twist, dtype=np.int64))
+              for perm, twist in move_tables(MOVES)]
+    store = np.zeros((N_STATES + size - 1) // size, dtype=np.uint8)
+    frontier = np.empty(0, np.int64)
+    while True:
+        command, arg = conn.recv()
+        if command == "start":
+            store[:] = 0
+            frontier = np.empty(0, np.int64)
+            if arg % size == rank:
+                store[arg // size] = START
+                frontier = np.array([arg], np.int64)
+            conn.send(store.nbytes)
+        elif command == "level":
+            successors, generated, hit = _expand(frontier, tables, found)
+            owner = (successors >> 3) % size
+            order = np.argsort(owner, kind="stable")
+            shards = np.split(successors[order], np.cumsum(np.bincount(owner, minlength=size))[:-1])
+            for k in range(size):
+                if k != rank:
+                    inboxes[k].put(shards[k])
+            received = np.concatenate([shards[rank]] + [inboxes[rank].get() for _ in range(size - 1)])
+            coords, first = np.unique(received >> 3, return_index=True)
+            local = coords // size
+            new = store[local] == 0
+            store[local[new]] = (received[first[new]] & 7) + 1
+            expanded, frontier = len(frontier), coords[new]
+            conn.send((expanded, generated, len(frontier), hit))
+        elif command == "move":
+            conn.send(int(store[arg // size]) - 1)
+        elif command == "stop":
+            return
+
+
+class ParallelSearch:
+    """
+    A pool of worker processes running breadth first searches over coordinates.
+
+    The workers are started once and reused by every search, and
+    are stopped by close or when leaving a with block.
+    """
+    def __init__(self, workers=None):
+        """
+        :param workers: Number of processes, by default os.cpu_count()
+        """
+        self.size = workers or os.cpu_count() or 1
+        self.found = Event()
+        inboxes = [Queue() for _ in range(self.size)]
+        self.conns = []
+        self.processes = []
+        for rank in range(self.size):
+            conn, child = Pipe()
+            p = Process(target=_worker, args=(rank, self.size, child, inboxes, self.found), daemon=True)
+            p.start()
+            self.conns.append(conn)
+            self.processes.append(p)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _all(self, command, arg=None):
+        for conn in self.conns:
+            conn.send((command, arg))
+        return [conn.recv() for conn in self.conns]
+
+    def search(self, start, on_level=None):
+        """
+        Find the minimal operations solving a coordinate.
+
+        :param start: The coordinate of the recolored cube, see coord.to_coord
+        :param on_level: An optional function called with the LevelStats of every depth
+        :returns: The string sequence of operations that solves the cube.
+        """
+        if start == SOLVED: return ""
+        self.found.clear()
+        memory = sum(self._all("start", start))
+        depth = 0
+        visited = 1
+        while True:
+            started = perf_counter()
+            replies = self._all("level")
+            expanded, generated, new = (sum(r[i] for r in replies) for i in range(3))
+            visited += new
+            if on_level is not None:
+                on_level(LevelStats(depth, expanded, generated, generated - new, new, visited,
+                                    perf_counter() - started, memory))
+            hits = [r[3] for r in replies if r[3] is not None]
+            if hits:
+                return self.backtrack(start, *hits[0])
+            if not new:
+                return None
+            depth += 1
+
+    def backtrack(self, start, coord, i):
+        """Rebuild the path from start through coord, from which move i reaches the solved cube."""
+        acc = MOVES[i]
+        while coord != start:
+            conn = self.conns[coord % self.size]
+            conn.send(("move", coord))
+            m = MOVES[conn.recv()]
+            acc = m + acc
+            coord = move(coord, m.swapcase())
+        return acc
+
+    def close(self):
+        """Stop the worker processes."""
+        for conn in self.conns:
+            conn.send(("stop", None))
+        for p in self.processes:
+            p.join()
+        self.conns = []
+        self.processes = []
+
+
+def _deep_cubes(n, seed):
+    """Return n coordinates of the deepest states, or random coordinates if no table is available."""
+    rng = np.random.default_rng(seed)
+    table = open_table(default_path())
+    if table is None:
+        return rng.integers(N_STATES, size=n).tolist()
+    distances = np.frombuffer(table.data, dtype=np.uint8)
+    return rng.choice(np.flatnonzero(distances == distances.max()), n, replace=False).tolist()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the scaling of the parallel search.")
+    parser.add_argument("--workers", type=lambda s: [int(i) for i in s.split(",")], default=[1, 2, 4, 8, 16],
+                        help="comma separated worker counts")
+    parser.add_argument("--cubes", type=int, default=3, help="deepest states solved per worker count")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    cubes = _deep_cubes(args.cubes, args.seed)
+    print(f"{'workers':>7}{'seconds':>10}{'speedup':>10}{'efficiency':>12}")
+    base = None
+    for w in args.workers:
+        with ParallelSearch(w) as search:
+            start = perf_counter()
+            for c in cubes:
+                search.search(c)
+            t = (perf_counter() - start) / len(cubes)
+        # Speedups are relative to the first worker count, assumed to scale linearly.
+        if base is None:
+            base = t * w
+        speedup = base / t
+        print(f"{w:>7}{t:>10.3f}{speedup:>10.2f}{speedup / w:>12.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Uniformly random states of a 2x2 rubiks cube.
+
+Instead of applying hundreds of random moves, a state is drawn directly: a
+uniformly random coordinate (see coord) picks the permutation of the 7 free
+corners and the twists of 6 of them, the last twist being implied by the
+others, so every legal state is equally likely. The cube can then be turned
+to one of its 24 orientations, as random R, B and D moves would do.
+
+random_cubes draws many states at once with numpy, building them from the
+tiles of every corner permutation and twist tabulated at import.
+"""
+
+from math import factorial
+
+import numpy as np
+
+from .coord import CORNERS, CORNER_COLORS, FIXED, FREE, N_STATES, N_TWIST, ORIENTATIONS, \
+                   decode_perm, decode_twist, from_coord
+from .convert import NIBBLES, arrays_to_bits
+from .engine import rot_str
+from array_cube.symmetry import ROTATION_PERMS
+
+# Every permutation of the free corners, and every twist of the free corners, by coordinate.
+_PERMS = np.array([[FREE[k] for k in decode_perm(p)] for p in range(factorial(len(FREE)))], dtype=np.intp)
+_TWISTS = np.array([decode_twist(t) for t in range(N_TWIST)], dtype=np.intp)
+
+# _COLORS[k, t, s] is the color of tile s of a corner position holding corner k with twist t.
+_COLORS = np.array([[[colors[(s - t) % 3] for s in range(3)] for t in range(3)] for colors in CORNER_COLORS],
+                   dtype=np.int8)
+_FREE_TILES = np.array([CORNERS[i] for i in FREE], dtype=np.intp)
+_NIBBLES = list(NIBBLES)
+
+
+def random_coord(rng=None):
+    """
+    Draw a uniformly random coordinate.
+
+    :param rng: A seed or numpy Generator
+    """
+    return int(np.random.default_rng(rng).integers(N_STATES))
+
+def random_cube(rng=None, rotate=False):
+    """
+    Draw a uniformly random legal cube.
+
+    :param rng: A seed or numpy Generator
+    :param rotate: Whether to also turn the cube to a random orientation,
+                   otherwise the down-back-right corner is solved, as with
+                   randomize, which only turns the L, F and U faces
+    :returns: The integer representation of the cube
+    """
+    rng = np.random.default_rng(rng)
+    cube = from_coord(int(rng.integers(N_STATES)))
+    if rotate:
+        cube = rot_str(cube, ORIENTATIONS[rng.integers(len(ORIENTATIONS))])
+    return cube
+
+def random_arrays(n, rng=None, rotate=False):
+    """
+    Draw n uniformly random legal cubes at once, see random_cube.
+
+    :param n: Number of cubes
+    :param rng: A seed or numpy Generator
+    :param rotate: Whether to also turn every cube to a random orientation
+    :returns: A (n, 6, 2, 2) int8 array of array_cube cubes
+    """
+    rng = np.random.default_rng(rng)
+    perm, twist = np.divmod(rng.integers(N_STATES, size=n), N_TWIST)
+    nibbles = np.empty((n, 24), dtype=np.int8)
+    nibbles[:, list(CORNERS[FIXED])] = CORNER_COLORS[FIXED]
+    nibbles[:, _FREE_TILES] = _COLORS[_PERMS[perm], _TWISTS[twist]]
+    cubes = nibbles[:, _NIBBLES]
+    if rotate:
+        rotations = ROTATION_PERMS[rng.integers(len(ORIENTATIONS), size=n)]
+        cubes = np.take_along_axis(cubes, rotations, axis=1)
+    return cubes.reshape(n, 6, 2, 2)
+
+def random_cubes(n, rng=None, rotate=False):
+    """
+    Draw n uniformly random legal cubes at once, see random_cube.
+
+    :returns: A list of the integer representations of the cubes
+    """
+    return arrays_to_bits(random_arrays(n, rng, rotate))
@@ -0,0 +1,288 @@
+"""
+A long running service solving 2x2 rubiks cubes.
+
+The service listens on a TCP port or a Unix socket and speaks newline
+delimited JSON. Every request line is an object holding the cube, either
+as "cube", its integer representation, or as "scramble", a move string
+applied to the solved cube, and optionally an "id" echoed in the response
+and a "deadline" in seconds:
+
+    {"id": 1, "scramble": "LFUlf", "deadline": 0.5}
+    {"id": 1, "solution": "lulFU", "length": 5, "seconds": 0.0004}
+
+Failed requests are answered with an "error" instead of a solution. The
+line {"op": "metrics"} is answered with the counters of the service.
+Requests of a connection are handled concurrently, so responses may be
+written in a different order than the requests.
+
+The distance table is loaded once and shared with a pool of worker
+processes through shared memory, see batch, so the solvers stay warm
+across requests. Requests for a state which is already being solved wait
+for the same result instead of being solved again. With a cache (see cache)
+solutions are remembered across requests, and rotations of a cube, or the
+states along a cached solution, are answered without reaching the pool.
+
+Run with python -m bit_cube.service [--port 8642 | --unix PATH], and load
+it with python -m bit_cube.client, see client.
+"""
+
+import argparse
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import json
+import os
+from time import perf_counter
+
+from . import batch
+from .engine import roll_str, rot_str
+from .cache import SolutionCache
+from .coord import solvable, to_coord
+from .manipulations import NEW
+from .symmetry import canonical_rotation, translate
+from .table import METRICS, DistanceTable, default_path, open_table
+
+PORT = 8642
+
+
+class SolveService:
+    """
+    Solve cubes received over asyncio streams on a pool of processes.
+
+    The counters of metrics are:
+        requests:  Requests received
+        responses: Responses written, including errors
+        coalesced: Requests which waited for a state already being solved
+        solved:    States solved by the pool
+        expired:   Requests whose deadline passed before their solution
+        errors:    Invalid requests and failed solves
+        pending:   States submitted to the pool and not yet solved, the queue depth
+        waiting:   Requests waiting for a solution
+        connections: Open connections
+    """
+    def __init__(self, workers=None, table=None, metric="quarter", deadline=None, cache=None):
+        """
+        :param workers: Number of processes, by default os.cpu_count()
+        :param table: A DistanceTable, the path of a table file, None for the
+                      default table of the metric, or False to search instead
+        :param deadline: The default deadline of requests in seconds, or None
+        :param cache: An optional cache.SolutionCache, whose statistics are
+                      added to the metrics
+        """
+        if table is None:
+            table = open_table(default_path(metric), metric)
+        elif table is not False and not isinstance(table, DistanceTable):
+            table = open_table(table, metric)
+        self.table = table or None
+        self.workers = workers or os.cpu_count() or 1
+        self.deadline = deadline
+        self.metric = metric
+        self.inflight = {}
+        self.counters = dict.fromkeys(("requests", "responses", "coalesced", "solved", "expired", "errors"), 0)
+        self.waiting = 0
+        self.connections = 0
+        self.pool = None
+        self.shm = None
+        self.started = None
+        self.cache = cache
+
+    def start(self):
+        """Start the worker processes and wait until they are ready."""
+        self.shm = batch.share_table(self.table) if self.table is not None else None
+        initargs = (self.shm.name if self.shm else None, self.table.metric if self.table else self.metric)
+        self.pool = ProcessPoolExecutor(self.workers, initializer=batch._init_worker, initargs=initargs)
+        # Solving one cube per worker starts every process and attaches the table.
+        for f in [self.pool.submit(batch._solve_one, NEW) for _ in range(self.workers)]:
+            f.result()
+        self.started = perf_counter()
+
+    def close(self):
+        """Stop the worker processes and release the shared table."""
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+        if self.cache is not None:
+            self.cache.close()
+
+    def metrics(self):
+        """Return the counters of the service, see SolveService."""
+        ret = {**self.counters, "pending": len(self.inflight), "waiting": self.waiting,
+               "connections": self.connections, "workers": self.workers,
+               "uptime": perf_counter() - self.started if self.started else 0.0}
+        if self.cache is not None:
+            ret["cache"] = self.cache.cache_info()._asdict()
+        return ret
+
+    async def solve(self, cube, deadline=None):
+        """
+        Solve a cube on the pool, sharing the result with identical requests in flight.
+
+        :param cube: The integer representation of the cube
+        :param deadline: Seconds to wait for the solution, or None to wait indefinitely
+        :raises asyncio.TimeoutError: If the deadline passed
+        :returns: The string sequence of operations that solves the cube,
+                  or None if the cube cannot be solved.
+        """
+        if not solvable(cube):
+            return None
+        if self.cache is not None:
+            # The canonical rotation is solved instead, so its solution can be cached.
+            rotation = canonical_rotation(cube)
+            cube = rot_str(cube, rotation)
+            s = self.cache.lookup(to_coord(cube))
+            if s is None:
+                s = await self._solve(cube, deadline)
+            return None if s is None else translate(s, rotation)
+        return await self._solve(cube, deadline)
+
+    async def _solve(self, cube, deadline):
+        entry = self.inflight.get(cube)
+        if entry is None:
+            submitted = self.pool.submit(batch._solve_one, cube)
+            future = asyncio.wrap_future(submitted)
+            entry = self.inflight[cube] = [future, 0, submitted]
+            future.add_done_callback(lambda f: self._done(cube, entry))
+        else:
+            self.counters["coalesced"] += 1
+        future = entry[0]
+        entry[1] += 1
+        self.waiting += 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), deadline)
+        finally:
+            self.waiting -= 1
+            entry[1] -= 1
+            # A state nobody waits for any more is dropped if the pool has not
+            # started solving it yet. A solve already running is left to finish,
+            # so its result is still counted and cached.
+            if not entry[1] and entry[2].cancel() and self.inflight.get(cube) is entry:
+                del self.inflight[cube]
+
+    def _done(self, cube, entry):
+        if self.inflight.get(cube) is entry:
+            del self.inflight[cube]
+            if not entry[0].cancelled():
+                self.counters["solved"] += 1
+                if self.cache is not None and entry[0].exception() is None and entry[0].result() is not None:
+                    self.cache.add(to_coord(cube), entry[0].result())
+
+    async def handle(self, line):
+        """
+        Answer a request line.
+
+        :returns: The response as a dictionary
+        """
+        start = perf_counter()
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be an object")
+        except ValueError as e:
+            self.counters["errors"] += 1
+            return {"error": f"invalid request: {e}"}
+        ret = {"id": request["id"]} if "id" in request else {}
+        if request.get("op") == "metrics":
+            return {**ret, "metrics": self.metrics()}
+        try:
+            cube = _cube(request)
+            deadline = request.get("deadline", self.deadline)
+            solution = await self.solve(cube, deadline)
+        except asyncio.TimeoutError:
+            self.counters["expired"] += 1
+            return {**ret, "error": "deadline exceeded"}
+        except Exception as e:
+            self.counters["errors"] += 1
+            return {**ret, "error": str(e) or type(e).__name__}
+        if solution is None:
+            self.counters["errors"] += 1
+            return {**ret, "error": "unsolvable cube"}
+        return {**ret, "solution": solution, "length": len(solution), "seconds": perf_counter() - start}
+
+    async def serve_connection(self, reader, writer):
+        """Answer every request of a connection, concurrently."""
+        self.connections += 1
+        lock = asyncio.Lock()
+        tasks = set()
+
+        async def respond(line):
+            response = await self.handle(line)
+            writer.write(json.dumps(response).encode() + b"\n")
+            self.counters["responses"] += 1
+            async with lock:
+                await writer.drain()
+
+        try:
+            while line := await reader.readline():
+                if not line.strip():
+                    continue
+                self.counters["requests"] += 1
+                task = asyncio.create_task(respond(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except ConnectionError:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.connections -= 1
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=PORT, path=None):
+        """
+        Serve requests until cancelled.
+
+        :param path: The path of a Unix socket, listened to instead of host and port
+        """
+        if self.pool is None:
+            self.start()
+        try:
+            if path is not None:
+                server = await asyncio.start_unix_server(self.serve_connection, path)
+            else:
+                server = await asyncio.start_server(self.serve_connection, host, port)
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.close()
+
+
+def _cube(request):
+    """Read the cube of a request."""
+    if "cube" in request:
+        cube = request["cube"]
+        if not isinstance(cube, int) or not 0 <= cube < 1 << 96:
+            raise ValueError("cube must be the integer representation of a cube")
+        return cube
+    if "scramble" in request:
+        return roll_str(NEW, request["scramble"])
+    raise ValueError("request holds neither a cube nor a scramble")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve 2x2 rubiks cube solutions over newline delimited JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, help="worker processes, by default one per cpu")
+    parser.add_argument("--table", help="distance table file, by default the one of the package")
+    parser.add_argument("--no-table", dest="table", action="store_false", help="search instead of reading a table")
+    parser.add_argument("--metric", choices=METRICS, default="quarter")
+    parser.add_argument("--deadline", type=float, help="default deadline of requests in seconds")
+    parser.add_argument("--cache", type=int, default=0, metavar="SIZE", help="number of solutions cached")
+    parser.add_argument("--cache-file", help="file backing the cache across restarts")
+    args = parser.parse_args(argv)
+
+    cache = SolutionCache(args.cache, args.cache_file) if args.cache else None
+    service = SolveService(args.workers, args.table, args.metric, args.deadline, cache)
+    try:
+        asyncio.run(service.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
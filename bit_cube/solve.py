@@ -0,0 +1,167 @@
+"""
+Solve a stream of 2x2 rubiks cubes from the command line.
+
+Every input line holds one cube, as a move string scrambling the solved cube
+("LFUlf"), the integer representation of a bit_cube cube, or a facelet string
+of 24 color letters (see convert). A line may also be a JSON object holding
+one of "scramble", "cube" or "facelets", and an optional "id" echoed in the
+output. Empty lines and lines starting with # are skipped.
+
+One JSON object is written per cube, in input order unless --unordered:
+
+    {"line": 1, "solution": "lulFU", "length": 5}
+    {"line": 2, "error": "unknown move 'X'"}
+
+Lines are read and solved in chunks over a pool of processes, see batch, so
+memory stays bounded whatever the size of the input. A summary of the rate
+and a histogram of the solution lengths is printed to stderr at the end.
+
+Run with python -m bit_cube.solve [--engine table|bit|array|object] [--workers N] [file ...]
+"""
+
+import argparse
+from collections import Counter
+from functools import partial
+import fileinput
+import json
+import sys
+from time import perf_counter
+
+from array_cube.solver import Solver as ArraySolver
+from object_cube.fast import FastCube, FastSolver
+from .batch import solve_many
+from .convert import bit_to_array, bit_to_object, facelets_to_bit
+from .engine import roll_str
+from .manipulations import NEW, dir_map
+from .solver import Solver
+from .table import METRICS, default_path, open_table
+
+
+def _table_engine(cube, table):
+    return Solver(cube, table=table, bidirectional=True).solve()
+
+def _bit_engine(cube, table):
+    return Solver(cube, bidirectional=True).solve()
+
+def _array_engine(cube, table):
+    return ArraySolver(bit_to_array(cube)).solve()
+
+def _object_engine(cube, table):
+    s = FastSolver(bit_to_object(cube, FastCube)).solve()
+    return None if s is None else "".join(s)
+
+# The solvers of every engine, taking the integer representation of a cube and
+# the distance table, and returning the solution. The table engine falls back
+# to the bidirectional search when no table is available.
+ENGINES = {"table": _table_engine, "bit": _bit_engine, "array": _array_engine, "object": _object_engine}
+
+
+def parse(line):
+    """
+    Read the cube of an input line.
+
+    :returns: The id of the line, or None, and the integer representation of the cube
+    :raises ValueError: If the line holds no valid cube
+    """
+    line = line.strip()
+    if line.startswith("{"):
+        record = json.loads(line)
+        for key, fn in (("scramble", _scramble), ("cube", int), ("facelets", facelets_to_bit)):
+            if key in record:
+                return record.get("id"), _check(fn(record[key]))
+        raise ValueError("object holds none of scramble, cube or facelets")
+    if line.isdigit():
+        return None, _check(int(line))
+    # Facelets hold colors which are not moves, such as O and W.
+    if len(line) == 24 and set(line) - set(dir_map):
+        return None, facelets_to_bit(line)
+    return None, _scramble(line)
+
+def _scramble(string):
+    return roll_str(NEW, string.replace(" ", ""))
+
+def _check(cube):
+    bit_to_array(cube)
+    return cube
+
+def _solve_line(engine, item, table):
+    """Solve a numbered input line, returning its output record."""
+    n, line = item
+    ret = {"line": n}
+    try:
+        i, cube = parse(line)
+        if i is not None:
+            ret["id"] = i
+        solution = ENGINES[engine](cube, table)
+    except Exception as e:
+        ret["error"] = str(e) or type(e).__name__
+        return ret
+    if solution is None:
+        ret["error"] = "unsolvable cube"
+    else:
+        ret["solution"] = solution
+        ret["length"] = len(solution)
+    return ret
+
+
+def _lines(files):
+    """Yield the number and text of every input line holding a cube."""
+    with fileinput.input(files) as f:
+        for n, line in enumerate(f, 1):
+            if line.strip() and not line.lstrip().startswith("#"):
+                yield n, line
+
+def summary(count, errors, lengths, seconds, out=sys.stderr):
+    """Print the number of cubes solved per second and a histogram of the solution lengths."""
+    print(f"{count:,} cubes, {errors:,} errors in {seconds:.2f}s, {count / seconds if seconds else 0:,.0f} cubes/s",
+          file=out)
+    if not lengths:
+        return
+    total = sum(lengths.values())
+    mean = sum(k * v for k, v in lengths.items()) / total
+    print(f"solution length, mean {mean:.2f}:", file=out)
+    width = max(lengths.values())
+    for k in range(min(lengths), max(lengths) + 1):
+        v = lengths.get(k, 0)
+        print(f"{k:4} {v:10,} {'#' * round(40 * v / width)}", file=out)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve 2x2 rubiks cubes, one per line, writing JSON lines.")
+    parser.add_argument("files", nargs="*", help="input files, stdin by default or for -")
+    parser.add_argument("-o", "--output", help="file the solutions are written to, stdout by default")
+    parser.add_argument("--engine", choices=ENGINES, default="table",
+                        help="solver used, the table engine searches when no table exists")
+    parser.add_argument("--table", help="distance table file, by default the one of the package")
+    parser.add_argument("--metric", choices=METRICS, default="quarter")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes, 0 for one per cpu")
+    parser.add_argument("--chunksize", type=int, default=256, help="lines sent to a worker at once")
+    parser.add_argument("--unordered", dest="ordered", action="store_false",
+                        help="write solutions as soon as they are found")
+    parser.add_argument("-q", "--quiet", action="store_true", help="do not print the summary")
+    args = parser.parse_args(argv)
+
+    table = False
+    if args.engine == "table":
+        table = open_table(args.table or default_path(args.metric), args.metric) or False
+    out = open(args.output, "w") if args.output else sys.stdout
+    count = errors = 0
+    lengths = Counter()
+    start = perf_counter()
+    try:
+        for _, record in solve_many(_lines(args.files), args.workers or None, table, args.metric, args.ordered,
+                                    args.chunksize, solve=partial(_solve_line, args.engine)):
+            out.write(json.dumps(record) + "\n")
+            count += 1
+            if "error" in record:
+                errors += 1
+            else:
+                lengths[record["length"]] += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    if not args.quiet:
+        summary(count, errors, lengths, perf_counter() - start)
+    return 1 if errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
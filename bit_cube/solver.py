@@ -1,5 +1,33 @@
-import numpy as np
-from .manipulations import *
+from .manipulations import NEW
+from .engine import roll_str
+from array import array
+from .coord import N_STATES, N_TWIST, SOLVED, recolor, solvable, to_coord, move_tables
+from .table import METRICS, DistanceTable, open_table
+from .heuristics import default_heuristic
+from .instrument import LevelStats, estimate_memory
+from .parallel import ParallelSearch
+from time import perf_counter
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def _follow(op, commuting, prune):
+    """Build the moves worth trying after every sequence of two moves, see Solver._init_follow."""
+    faces = [m.upper() for m in op]
+    follow = {}
+    for before in ("",) + op:
+        for last in ("",) + op:
+            ok = []
+            for m in op:
+                if prune and last:
+                    if m == last.swapcase(): continue
+                    if m == last == before: continue
+                    if (any(last.upper() + m.upper() in (c, c[::-1]) for c in commuting)
+                            and faces.index(m.upper()) < faces.index(last.upper())):
+                        continue
+                ok.append(m)
+            follow[before + last] = ok
+    return follow
 
 
 class Solver:
@@ -10,72 +38,383 @@ class Solver:
     as it reduces the memory required due to less objects being created.
     """
     op = ["L", "l", "F", "f", "U", "u"]
-    def __init__(self, cube):
+    # Pairs of faces whose turns commute, as they share no tiles.
+    commuting = ["LR", "FB", "UD"]
+    def __init__(self, cube, table=None, bidirectional=False, prune=True, compact=False, observer=None,
+                 workers=None):
         """
         Initializes a solver for a specific cube.
 
         :param cube: The Cube object to be solved.
+        :param table: An optional DistanceTable, which replaces
+                      the search with a lookup of the solution, or the
+                      path of a table file, which is memory mapped on the
+                      first solve. If the file is missing or invalid
+                      the solver falls back to the search.
+        :param bidirectional: Whether to search from both the cube and
+                              the solved cube, see solve_bidirectional.
+        :param prune: Whether to skip moves that provably lead to states
+                      already reachable by a shorter or equivalent sequence.
+        :param compact: Whether to search over coordinates with bit packed
+                        visited and move stores, see solve_compact.
+        :param observer: An optional instrument.Observer notified of the
+                         progress of the search after every depth.
+        :param workers: A number of processes, or a parallel.ParallelSearch,
+                        to split the search across, see solve_parallel.
         """
         self.org = cube
-        self.queue = [cube]
-        self.visited = {cube: (None, "")}
-        self._init_final()
+        self.observer = observer
+        self.table = table
+        self.bidirectional = bidirectional
+        self.compact = compact
+        self.workers = workers
+        self.queue = []
+        self.visited = {}
+        self.generated = 0
+        self._init_follow(prune)
+
+    def _start(self):
+        """
+        Queue the cube for the breadth first search.
+
+        The search runs on the recolored cube (see coord), which has the
+        solved cube as its only target and is solved by turning L, F and U.
+        """
+        start = recolor(self.org)
+        self.queue = [start]
+        self.visited = {start: (None, "")}
 
-    def _init_final(self):
+    def _init_follow(self, prune):
         """
-        Initializes the final nodes of the graph.
+        Initializes the moves worth trying after every sequence of two moves.
 
-        As the cube is not rotation invariant,
-        several final nodes are required for every
-        different rotation of the completed cube.
+        A move is skipped if it undoes the previous move, if it would be the
+        third identical turn in a row, which equals a single inverse turn,
+        or if it commutes with the previous move and comes before it in op,
+        as the other order reaches the same state.
         """
-        self.final = []
-        # acc = 0
-        for i in ["", "L", "l", "F", "f", "LL"]:
-            c = rot_str(new_cube(), i)
-            for j in range(0,4):
-                cc = rot_str(c, "U"*j)
-                self.final.append(cc)
+        self.follow = _follow(tuple(self.op), tuple(self.commuting), prune)
+
+    def successors(self, node, visited=None):
+        """Return the moves worth trying from a node, based on the last two moves reaching it."""
+        if visited is None: visited = self.visited
+        parent, last = visited[node]
+        before = visited[parent][1] if parent is not None else ""
+        return self.follow[before + last]
 
     def solve(self):
         """
         Find the minimal operations required to solve the rubiks cube.
 
+        :returns: The string sequence of operations that solves the cube,
+                  or None if the cube cannot be solved.
+        """
+        if not solvable(self.org): return None
+        self._start()
+        if self.table is not None:
+            s = self._run("table", self.solve_table)
+            if s is not None: return s
+        if self.workers:
+            return self._run("parallel", self.solve_parallel)
+        if self.bidirectional:
+            return self._run("bidirectional", self.solve_bidirectional)
+        if self.compact:
+            return self._run("compact", self.solve_compact)
+        return self._run("bfs", self.solve_bfs)
+
+    def _run(self, method, search):
+        """Run a search, notifying the observer of its start and result."""
+        if self.observer is None: return search()
+        self.observer.on_start(self, method)
+        s = search()
+        self.observer.on_finish(self, s)
+        return s
+
+    def _level(self, depth, expanded, generated, frontier, visited, start, *containers):
+        """Notify the observer of the statistics of a depth of the search."""
+        self.observer.on_level(self, LevelStats(depth, expanded, generated, generated - frontier, frontier, visited,
+                                                perf_counter() - start, estimate_memory(*containers)))
+
+    def solve_bfs(self):
+        """
+        Find the minimal operations required to solve the rubiks cube, one depth at a time.
+
         :returns: The string sequence of operations that solves the cube.
         """
-        acc = 0
-        if self.queue[0] in self.final: return ""
+        if self.queue[0] == NEW: return ""
+        depth = 0
         while self.queue:
-            print(acc)
-            acc += 1
-            s = self.search()
+            frontier, self.queue = self.queue, []
+            if self.observer is not None:
+                start, generated = perf_counter(), self.generated
+            s = None
+            for step in frontier:
+                s = self.expand(step)
+                if s is not None: break
+            if self.observer is not None:
+                self._level(depth, len(frontier), self.generated - generated, len(self.queue),
+                            len(self.visited), start, self.visited, self.queue)
             if s is not None: return s
+            depth += 1
+
+    def solve_table(self):
+        """
+        Read the minimal operations required to solve the rubiks cube from the table.
+
+        The solution is in the move metric of the table, so in the half turn
+        metric it may contain double turns, such as "LL".
+
+        :returns: The string sequence of operations that solves the cube,
+                  or None if the table could not be loaded.
+        """
+        if not isinstance(self.table, DistanceTable):
+            self.table = open_table(self.table)
+            if self.table is None: return None
+        return self.table.solution(to_coord(recolor(self.org)))
+
+    def solve_bidirectional(self):
+        """
+        Find the minimal operations required to solve the rubiks cube by searching from both ends.
+
+        The cube is recolored so that a single solved state is the target,
+        and whole depths of the search are expanded alternately from the cube
+        and from the solved cube, whichever frontier is smaller, until the two
+        searches meet. The path to the meeting state is then joined with the
+        inverse of the path from the solved cube to it.
+
+        :returns: The string sequence of operations that solves the cube.
+        """
+        start = recolor(self.org)
+        if start == NEW: return ""
+        self.visited = {start: (None, "")}
+        self.rvisited = {NEW: (None, "")}
+        sides = [[self.visited, [start]], [self.rvisited, [NEW]]]
+        depth = 0
+        while sides[0][1] and sides[1][1]:
+            side = sides[0] if len(sides[0][1]) <= len(sides[1][1]) else sides[1]
+            visited, frontier = side
+            other = sides[1][0] if visited is self.visited else sides[0][0]
+            side[1] = []
+            meet = []
+            if self.observer is not None:
+                started, generated = perf_counter(), self.generated
+            for step in frontier:
+                for s in self.successors(step, visited):
+                    self.generated += 1
+                    manstep = roll_str(step, s)
+                    if manstep not in visited:
+                        visited[manstep] = (step, s)
+                        if manstep in other:
+                            meet.append(manstep)
+                        side[1].append(manstep)
+            if self.observer is not None:
+                self._level(depth, len(frontier), self.generated - generated, len(side[1]),
+                            len(self.visited) + len(self.rvisited), started,
+                            self.visited, self.rvisited, sides[0][1], sides[1][1])
+            depth += 1
+            if meet:
+                paths = (self.backtrack(m) + self.backtrack(m, self.rvisited)[::-1].swapcase()
+                         for m in meet)
+                return min(paths, key=len)
+
+    def solve_iter(self):
+        """
+        Find every optimal solution of the rubiks cube, lazily.
+
+        The recolored cube is searched over coordinates from both ends, a
+        whole depth at a time, keeping the depth at which each side reached
+        every state. Once the searches meet, every shortest path crosses the
+        newest depth at a state the other side reached at its last depth, and
+        the paths through these states are rebuilt by walking each side back
+        one depth at a time.
+
+        A LevelStats is yielded after every depth of the search, followed by
+        the solutions in turn, so the caller may stop after the first one,
+        take a few, or exhaust the generator to collect all of them, and
+        only pays for the solutions consumed. Solutions only turn the L, F
+        and U faces, and solutions which merely rotate the whole cube
+        differently are not repeated.
+
+        :returns: A generator of LevelStats and move strings, which is
+                  empty if the cube cannot be solved.
+        """
+        if not solvable(self.org): return
+        start = to_coord(recolor(self.org))
+        if start == SOLVED:
+            yield ""
+            return
+        forward = move_tables(self.op)
+        backward = move_tables([s.swapcase() for s in self.op])
+
+        def neighbours(c, tables):
+            p, t = divmod(c, N_TWIST)
+            for i, (ptab, ttab) in enumerate(tables):
+                yield i, ptab[p] * N_TWIST + ttab[t]
+
+        depths = [{start: 0}, {SOLVED: 0}]
+        frontiers = [[start], [SOLVED]]
+        reached = [0, 0]
+        level = 0
+        meet = []
+        while not meet:
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            seen = depths[side]
+            tables = forward if side == 0 else backward
+            started = perf_counter()
+            reached[side] += 1
+            found = []
+            generated = 0
+            for c in frontiers[side]:
+                for _, n in neighbours(c, tables):
+                    generated += 1
+                    if n not in seen:
+                        seen[n] = reached[side]
+                        found.append(n)
+            self.generated += generated
+            yield LevelStats(level, len(frontiers[side]), generated, generated - len(found), len(found),
+                             len(depths[0]) + len(depths[1]), perf_counter() - started,
+                             estimate_memory(*depths, *frontiers))
+            frontiers[side] = found
+            level += 1
+            other = depths[1 - side]
+            meet = [n for n in found if other.get(n) == reached[1 - side]]
+
+        def heads(c):
+            """Every shortest move string from the cube to c."""
+            if c == start:
+                yield ""
+                return
+            for i, n in neighbours(c, backward):
+                if depths[0].get(n) == depths[0][c] - 1:
+                    for h in heads(n):
+                        yield h + self.op[i]
+
+        def tails(c):
+            """Every shortest move string from c to the solved cube."""
+            if c == SOLVED:
+                yield ""
+                return
+            for i, n in neighbours(c, forward):
+                if depths[1].get(n) == depths[1][c] - 1:
+                    for t in tails(n):
+                        yield self.op[i] + t
+
+        for m in meet:
+            rest = None
+            for h in heads(m):
+                if rest is None: rest = list(tails(m))
+                for t in rest:
+                    yield h + t
+
+    def solve_compact(self):
+        """
+        Find the minimal operations required to solve the rubiks cube with a few MB of memory.
+
+        The search runs over the coordinates of the recolored cube (see coord).
+        Visited states are a bitmap indexed by coordinate, and the move
+        reaching each state is stored in a packed array of 4 bit entries,
+        holding its index in op plus one. Instead of storing parents, the
+        path is rebuilt backwards from the solved cube by applying the
+        inverse of the move stored for each state.
+
+        :returns: The string sequence of operations that solves the cube.
+        """
+        start = to_coord(recolor(self.org))
+        self.seen = bytearray((N_STATES + 7) // 8)
+        self.moves = bytearray((N_STATES + 1) // 2)
+        self.seen[start >> 3] |= 1 << (start & 7)
+        if start == SOLVED: return ""
+        tables = move_tables(self.op)
+        follow = {m: [(self.op.index(s), s) for s in self.follow[m]] for m in [""] + self.op}
+        level = array('I', [start])
+        depth = 0
+        visited = 1
+        while level:
+            found = array('I')
+            if self.observer is not None:
+                started, generated = perf_counter(), self.generated
+            for c in level:
+                m = (self.moves[c >> 1] >> 4*(c & 1)) & 0xf
+                p, t = divmod(c, N_TWIST)
+                for i, s in follow[self.op[m - 1] if m else ""]:
+                    self.generated += 1
+                    ptab, ttab = tables[i]
+                    n = ptab[p] * N_TWIST + ttab[t]
+                    if not self.seen[n >> 3] >> (n & 7) & 1:
+                        self.seen[n >> 3] |= 1 << (n & 7)
+                        self.moves[n >> 1] |= (i + 1) << 4*(n & 1)
+                        if n == SOLVED:
+                            if self.observer is not None:
+                                self._level(depth, len(level), self.generated - generated, len(found) + 1,
+                                            visited + len(found) + 1, started, self.seen, self.moves, level, found)
+                            return self.backtrack_compact(n, start)
+                        found.append(n)
+            visited += len(found)
+            if self.observer is not None:
+                self._level(depth, len(level), self.generated - generated, len(found), visited, started,
+                            self.seen, self.moves, level, found)
+            depth += 1
+            level = found
+
+    def solve_parallel(self):
+        """
+        Find the minimal operations required to solve the rubiks cube over several processes.
+
+        Like solve_compact the search runs over coordinates, but every depth
+        is split across worker processes by coordinate, see parallel.
+
+        :returns: The string sequence of operations that solves the cube.
+        """
+        start = to_coord(recolor(self.org))
+        on_level = None if self.observer is None else lambda level: self.observer.on_level(self, level)
+        if isinstance(self.workers, ParallelSearch):
+            return self.workers.search(start, on_level)
+        with ParallelSearch(self.workers) as search:
+            return search.search(start, on_level)
+
+    def backtrack_compact(self, node, start):
+        """Rebuild the path to a coordinate from the moves stored by solve_compact."""
+        tables = move_tables([s.swapcase() for s in self.op])
+        acc = ""
+        while node != start:
+            m = ((self.moves[node >> 1] >> 4*(node & 1)) & 0xf) - 1
+            acc = self.op[m] + acc
+            p, t = divmod(node, N_TWIST)
+            node = tables[m][0][p] * N_TWIST + tables[m][1][t]
+        return acc
 
     def search(self):
         """
-        Performs an iteration of the depth first search.
+        Performs an iteration of the breadth first search, expanding the first queued node.
+
+        :returns: The solution if it was found, otherwise None.
+        """
+        return self.expand(self.queue.pop(0))
+
+    def expand(self, step):
+        """
+        Generates and searches all adjacent nodes to a node for the finished state.
 
-        It generates and searches all adjacent nodes to the queued node
-        and searches it for the finished state.
         In this case, an adjcaent node is a cube state that is reachable
-        by performing a single roll operation.
+        by performing a single roll operation. New nodes are queued.
         """
-        step = self.queue.pop(0)
-        for s in self.op:
+        for s in self.successors(step):
+            self.generated += 1
             manstep = roll_str(step, s)
             if manstep not in self.visited:
                 self.visited[manstep] = (step, s)
-                if manstep in self.final:
+                if manstep == NEW:
                     return self.backtrack(manstep)
                 self.queue.append(manstep)
 
-    def backtrack(self, node):
+    def backtrack(self, node, visited=None):
+        if visited is None: visited = self.visited
         acc = ""
-        # print(self.visited[node])
-        while self.visited[node][0] is not None:
+        # print(visited[node])
+        while visited[node][0] is not None:
             # print(acc)
-            acc = self.visited[node][1] + acc
-            node = self.visited[node][0]
+            acc = visited[node][1] + acc
+            node = visited[node][0]
         return acc
 
 
@@ -88,3 +427,97 @@ class Solver:
     #             return s
     #         c = len(self.visited[self.queue[0]][1]) <= i
     #     return 'search failed'
+
+
+class IDASolver:
+    """
+    A rubiks cube solver based on iterative deepening A*.
+
+    The search runs depth first over coordinates, keeping only the current
+    path, so its memory use is bounded by the depth of the solution instead
+    of the number of states explored. Branches are cut as soon as the moves
+    taken plus the heuristic exceed the current bound, which only increases
+    to the next smallest exceeded value, so the solution found is optimal.
+    """
+    def __init__(self, cube, heuristic=None, metric="quarter", observer=None):
+        """
+        Initializes a solver for a specific cube.
+
+        :param cube: The integer representation of the cube to be solved.
+        :param heuristic: An admissible heuristic, see heuristics. Defaults
+                          to the larger of the permutation and twist bounds.
+        :param metric: The move metric of the solution, a key of METRICS.
+        :param observer: An optional instrument.Observer notified after every
+                         iteration, whose depth is the bound of the iteration.
+        """
+        self.org = cube
+        self.observer = observer
+        self.moves = METRICS[metric]
+        self.tables = move_tables(self.moves)
+        self.heuristic = default_heuristic(metric) if heuristic is None else heuristic
+        # Moves never worth taking after each move: the inverse in the quarter
+        # turn metric, and any turn of the same face in the half turn metric.
+        self.follow = []
+        for m in self.moves:
+            if metric == "half":
+                skip = {i for i, n in enumerate(self.moves) if n[0].lower() == m[0].lower()}
+            else:
+                skip = {self.moves.index(m.swapcase())}
+            self.follow.append([i for i in range(len(self.moves)) if i not in skip])
+        self.follow.append(list(range(len(self.moves))))
+        self.path = []
+        self.nodes = 0
+
+    def solve(self):
+        """
+        Find the minimal operations required to solve the rubiks cube.
+
+        :returns: The string sequence of operations that solves the cube,
+                  or None if the cube cannot be solved.
+        """
+        if not solvable(self.org): return None
+        if self.observer is not None:
+            self.observer.on_start(self, "ida")
+        perm, twist = divmod(to_coord(recolor(self.org)), N_TWIST)
+        self.path = []
+        bound = self.heuristic(perm, twist)
+        while True:
+            if self.observer is not None:
+                start, nodes = perf_counter(), self.nodes
+            r = self.search(perm, twist, 0, bound, -1)
+            if self.observer is not None:
+                # Every node of the tree search is new, and none is kept but the path.
+                n = self.nodes - nodes
+                self.observer.on_level(self, LevelStats(bound, n, n, 0, 0, n, perf_counter() - start,
+                                                        estimate_memory(self.path)))
+            if r is True:
+                s = "".join(self.path)
+                if self.observer is not None:
+                    self.observer.on_finish(self, s)
+                return s
+            bound = r
+
+    def search(self, perm, twist, depth, bound, last):
+        """
+        Performs a depth first search below a state, up to a bound.
+
+        Moves are pushed to and popped from self.path in place, so
+        the path always leads from the cube to the current state.
+
+        :param last: The index of the move reaching the state, or -1
+        :returns: True if the cube is solved within the bound, otherwise
+                  the smallest estimate that exceeded the bound.
+        """
+        self.nodes += 1
+        f = depth + self.heuristic(perm, twist)
+        if f > bound: return f
+        if perm == 0 and twist == 0: return True
+        ret = float("inf")
+        for i in self.follow[last]:
+            ptab, ttab = self.tables[i]
+            self.path.append(self.moves[i])
+            r = self.search(ptab[perm], ttab[twist], depth + 1, bound, i)
+            if r is True: return True
+            self.path.pop()
+            ret = min(ret, r)
+        return ret
@@ -0,0 +1,271 @@
+"""
+Reproducible benchmarks of every engine and solver of the repository.
+
+For each engine, the throughput of single roll and rot operations and of
+hashing states is measured. For each solver, random scrambles of every depth
+are solved to record the latency percentiles, the number of states expanded,
+the solution length and the peak memory traced by tracemalloc. Scrambles
+are drawn from fixed seeds, so two runs solve exactly the same cubes.
+
+Results are written as JSON, and a previous result file can be compared
+against to catch performance regressions between commits.
+
+Run with python -m bit_cube.suite [-o results.json] [--compare old.json]
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tracemalloc
+from random import Random
+from time import perf_counter
+from timeit import timeit
+
+import numpy as np
+
+from array_cube import manipulations as _array
+from array_cube.solver import Solver as ArraySolver
+from object_cube.cube import Cube
+from object_cube.fast import FastCube, FastSolver
+from object_cube.node import Solver as ObjectSolver
+from . import engine
+from .instrument import SearchStats
+from .manipulations import NEW, hash_cube
+from .solver import IDASolver, Solver
+from .table import default_path, open_table
+
+MOVES = "LlFfUuRrBbDd"
+ROTATIONS = "LlFfUu"
+
+
+def _object_op(method):
+    def op(cube, i):
+        getattr(cube, method)(i)
+        return cube
+    return op
+
+# The operations of every engine, each taking and returning a cube.
+ENGINES = {
+    "bit_cube": {"new": lambda: NEW, "roll": engine.roll_str, "rot": engine.rot_str,
+                 "hash": {"hash_cube": hash_cube}},
+    "array_cube": {"new": _array.new_cube, "roll": _array.roll_str, "rot": _array.rot_str,
+                   "hash": {"hash_cube": _array.hash_cube, "key_cube": _array.key_cube}},
+    "object_cube.Cube": {"new": Cube, "roll": _object_op("roll_str"), "rot": _object_op("rot_str"),
+                         "hash": {"hash_state": Cube.hash_state, "key_state": Cube.key_state}},
+    "object_cube.FastCube": {"new": FastCube, "roll": _object_op("roll_str"),
+                             "rot": _object_op("rot_str"),
+                             "hash": {"hash_state": FastCube.hash_state}},
+}
+
+
+def _scrambled(name, string):
+    """Build a cube of an engine scrambled by a move string."""
+    e = ENGINES[name]
+    return e["roll"](e["new"](), string)
+
+# Every solver, as the engine of its cube, a function solving a cube and
+# returning the solution and the number of states expanded, and the deepest
+# scramble it is benchmarked at by default. Expanded states are counted the
+# same way for every solver, from the levels reported to a SearchStats.
+def _observed(cls, **kwargs):
+    def solve(cube):
+        stats = SearchStats()
+        return cls(cube, observer=stats, **kwargs).solve(), stats.expanded
+    return solve
+
+def _object_solver(cube):
+    # The object solver takes no observer, so its searches are counted here.
+    s = ObjectSolver(cube)
+    expanded = 0
+    while s.queue:
+        expanded += 1
+        solution = s.search()
+        if solution is not None:
+            return solution, expanded
+
+SOLVERS = {
+    "bit_cube.Solver(table)": ("bit_cube", _observed(Solver, table=default_path()), 14),
+    "bit_cube.Solver(bidirectional)": ("bit_cube", _observed(Solver, bidirectional=True), 14),
+    "bit_cube.Solver(compact)": ("bit_cube", _observed(Solver, compact=True), 14),
+    "bit_cube.IDASolver": ("bit_cube", _observed(IDASolver), 14),
+    "array_cube.Solver": ("array_cube", _observed(ArraySolver), 14),
+    "object_cube.FastSolver": ("object_cube.FastCube", _observed(FastSolver), 5),
+    "object_cube.Solver": ("object_cube.Cube", _object_solver, 4),
+}
+
+
+def scramble(depth, rng):
+    """Return a random sequence of depth roll operations without immediate inverses."""
+    s = ""
+    while len(s) < depth:
+        i = rng.choice(MOVES)
+        if not s or i != s[-1].swapcase():
+            s += i
+    return s
+
+def move_throughput(name, moves=5000, repeat=3, seed=0):
+    """
+    Measure the throughput of single roll and rot operations of an engine.
+
+    :param name: A key of ENGINES
+    :param moves: Number of operations timed per run
+    :param repeat: Number of runs, the fastest of which is reported
+    :returns: A dictionary of operations per second for roll and rot
+    """
+    e = ENGINES[name]
+    rng = Random(seed)
+    ret = {}
+    for op, chars in (("roll", MOVES), ("rot", ROTATIONS)):
+        seq = [rng.choice(chars) for _ in range(moves)]
+        fn = e[op]
+
+        def run():
+            c = e["new"]()
+            for i in seq:
+                c = fn(c, i)
+
+        ret[op] = moves / min(timeit(run, number=1) for _ in range(repeat))
+    return ret
+
+def hash_throughput(name, cubes=1000, repeat=3, seed=0):
+    """
+    Measure the throughput of every hashing function of an engine.
+
+    :returns: A dictionary of hashes per second for every function
+    """
+    rng = Random(seed)
+    pool = [_scrambled(name, scramble(20, rng)) for _ in range(cubes)]
+    ret = {}
+    for fn_name, fn in ENGINES[name]["hash"].items():
+        run = lambda: [fn(c) for c in pool]
+        ret[fn_name] = cubes / min(timeit(run, number=1) for _ in range(repeat))
+    return ret
+
+def solver_latency(name, depths, samples=5, seed=0, memory=True):
+    """
+    Measure the latency of a solver on random scrambles of every depth.
+
+    The scrambles of a depth only depend on the seed and the depth.
+
+    :param name: A key of SOLVERS
+    :param depths: Scramble depths, those above the depth limit of the solver are skipped
+    :param samples: Number of scrambles solved per depth
+    :param memory: Whether to also solve the first scramble of every depth under tracemalloc
+    :returns: A dictionary of the statistics of every depth
+    """
+    engine_name, solve, limit = SOLVERS[name]
+    ret = {}
+    for depth in depths:
+        if depth > limit:
+            continue
+        rng = Random(f"{seed}:{depth}")
+        cubes = [_scrambled(engine_name, scramble(depth, rng)) for _ in range(samples)]
+        times, nodes, lengths = [], [], []
+        for cube in cubes:
+            start = perf_counter()
+            solution, n = solve(cube)
+            times.append(perf_counter() - start)
+            nodes.append(n)
+            lengths.append(len(solution))
+        peak = None
+        if memory:
+            tracemalloc.start()
+            solve(cubes[0])
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        p50, p95, p99 = np.percentile(times, [50, 95, 99]).tolist()
+        ret[depth] = {"p50": p50, "p95": p95, "p99": p99, "mean": sum(times) / len(times),
+                      "nodes": sum(nodes) / len(nodes), "length": sum(lengths) / len(lengths),
+                      "peak_bytes": peak}
+    return ret
+
+
+def _commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(depths=range(1, 15), samples=5, seed=0, solvers=None, memory=True):
+    """
+    Run the whole benchmark suite.
+
+    :param solvers: Keys of SOLVERS to benchmark, all of them by default
+    :returns: A JSON serializable dictionary of the results
+    """
+    solvers = list(SOLVERS if solvers is None else solvers)
+    # The table solver is skipped when no table has been built, see table.
+    if "bit_cube.Solver(table)" in solvers and open_table(default_path()) is None:
+        solvers.remove("bit_cube.Solver(table)")
+    return {
+        "meta": {"commit": _commit(), "python": sys.version.split()[0], "numpy": np.__version__,
+                 "platform": platform.platform(), "seed": seed, "samples": samples},
+        "moves": {name: move_throughput(name, seed=seed) for name in ENGINES},
+        "hashing": {name: hash_throughput(name, seed=seed) for name in ENGINES},
+        "solvers": {name: solver_latency(name, depths, samples, seed, memory) for name in solvers},
+    }
+
+def compare(old, new, tolerance=0.2):
+    """
+    List the measurements of new which are worse than in old by more than tolerance.
+
+    Throughputs regress when they decrease, and solver latencies when their p50 increases.
+
+    :param old: Results of a previous run
+    :param new: Results of the current run
+    :returns: A list of descriptions of every regression
+    """
+    ret = []
+    for section in ("moves", "hashing"):
+        for name, values in new[section].items():
+            for op, rate in values.items():
+                before = old.get(section, {}).get(name, {}).get(op)
+                if before and rate < before * (1 - tolerance):
+                    ret.append(f"{section} {name} {op}: {before:,.0f}/s -> {rate:,.0f}/s")
+    for name, depths in new["solvers"].items():
+        for depth, stats in depths.items():
+            before = old.get("solvers", {}).get(name, {}).get(str(depth))
+            if before and stats["p50"] > before["p50"] * (1 + tolerance):
+                ret.append(f"solver {name} depth {depth}: p50 {before['p50']:.4f}s -> {stats['p50']:.4f}s")
+    return ret
+
+
+def _depths(string):
+    lo, _, hi = string.partition("-")
+    return range(int(lo), int(hi or lo) + 1)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-o", "--output", help="file the JSON results are written to")
+    parser.add_argument("--depths", type=_depths, default=range(1, 15), help="scramble depths, e.g. 1-14")
+    parser.add_argument("--samples", type=int, default=5, help="scrambles solved per depth")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--solvers", type=lambda s: s.split(","), help="comma separated solvers, see SOLVERS")
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="skip tracemalloc runs")
+    parser.add_argument("--compare", help="JSON results of a previous run to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="relative slowdown reported by --compare")
+    args = parser.parse_args(argv)
+
+    results = run(args.depths, args.samples, args.seed, args.solvers, args.memory)
+    # Round trip through JSON so depths are compared as strings in both results.
+    results = json.loads(json.dumps(results))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), results, args.tolerance)
+        for r in regressions:
+            print("regression:", r, file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""
+Reduction of the integer representation of a 2x2 rubiks cube under whole cube rotations.
+
+The 24 rotations of a cube all describe the same physical puzzle. Exactly one
+of them has the down-back-right corner solved, which is used as the canonical
+representative of the rotation class. Since the L, F and U turns never move
+that corner, a search using only those turns never leaves canonical states.
+
+Mirror symmetry is not used, as mirroring a cube changes the handedness of
+its turns and solutions could not be mapped back by relabelling faces alone.
+"""
+
+from .manipulations import NEW
+from .engine import ROLL_PERMS, ROT_STR_NETWORKS, ROT_PERMS, apply_network, compose, dir_map
+from .coord import CORNERS, FIXED, ORIENTATIONS
+
+
+def _rotation_perm(rotation):
+    return compose(*(ROT_PERMS[dir_map[i][0]][dir_map[i][1] % 4] for i in rotation))
+
+ROTATION_PERMS = tuple(_rotation_perm(o) for o in ORIENTATIONS)
+ROTATION_NETWORKS = tuple(tuple(ROT_STR_NETWORKS[i] for i in o) for o in ORIENTATIONS)
+
+# The tiles of a cube that each rotation moves onto the fixed corner.
+_SOURCES = tuple(tuple(p[i] for i in CORNERS[FIXED]) for p in ROTATION_PERMS)
+_TARGET = tuple((NEW >> 4*i) & 0b1111 for i in CORNERS[FIXED])
+
+
+def _build_move_maps():
+    """
+    Map every move on a rotated cube to the equivalent move on the original cube.
+
+    A move on face g of a rotated cube turns the face of the original cube
+    which the rotation moved onto g, in the same direction.
+    """
+    maps = []
+    for p in ROTATION_PERMS:
+        m = {}
+        for i, (face, direction) in dir_map.items():
+            turn = ROLL_PERMS[face][direction % 4]
+            m[i] = next(j for j, (f, d) in dir_map.items()
+                        if compose(p, turn) == compose(ROLL_PERMS[f][d % 4], p))
+        maps.append(m)
+    return tuple(maps)
+
+MOVE_MAPS = _build_move_maps()
+
+
+def canonical_index(cube):
+    """
+    Find the rotation taking a cube to its canonical representative.
+
+    :returns: An index into ORIENTATIONS
+    :raises ValueError: If no rotation solves the down-back-right corner
+    """
+    for i, src in enumerate(_SOURCES):
+        if all((cube >> 4*j) & 0b1111 == t for j, t in zip(src, _TARGET)):
+            return i
+    raise ValueError("cube has no orientation with a solved corner")
+
+def canonical_rotation(cube):
+    """Return the rotation string taking a cube to its canonical representative, see rot_str."""
+    return ORIENTATIONS[canonical_index(cube)]
+
+def canonical(cube):
+    """Return the representative of the rotation class of a cube."""
+    for n in ROTATION_NETWORKS[canonical_index(cube)]:
+        cube = apply_network(cube, n)
+    return cube
+
+def translate(string, rotation):
+    """
+    Map roll operations on a rotated cube to the original cube.
+
+    If string solves rot_str(cube, rotation), translate(string, rotation)
+    solves cube, possibly turning the R, B and D faces.
+
+    :param string: A sequence of roll operations, see roll_str
+    :param rotation: One of the rotation strings in ORIENTATIONS
+    """
+    m = MOVE_MAPS[ORIENTATIONS.index(rotation)]
+    return "".join(m[i] for i in string)
@@ -0,0 +1,189 @@
+"""
+Precomputed distance table of every 2x2 rubiks cube state.
+
+The table stores the exact number of moves from every coordinate (see coord)
+to the solved cube, one byte per state. Building it is a one time breadth
+first search over coordinates, after which the optimal solution of any cube
+is read by repeatedly taking a move that decreases the distance, at most 14
+lookups in the quarter turn metric and 11 in the half turn metric.
+
+Table files are memory mapped read-only, so every process solving with the
+same file shares a single copy of it through the page cache.
+
+Generate a table with python -m bit_cube.table [--metric half] [path], or over
+several processes, with checkpoints and verification, with python -m bit_cube.build
+"""
+
+import argparse
+from functools import lru_cache
+import mmap
+import os
+import struct
+import warnings
+import zlib
+
+import numpy as np
+
+from .coord import N_STATES, N_TWIST, SOLVED, move_str, move_tables
+
+METRICS = {"quarter": ("L", "l", "F", "f", "U", "u"),
+           "half": ("L", "l", "LL", "F", "f", "FF", "U", "u", "UU")}
+
+MAGIC = b"RBKD"
+VERSION = 2
+# Layout of the table file: magic, version, metric, encoding, number of states
+# and crc32 of the data, followed by the data. Encodings name the layout of
+# the data, currently one byte holding the distance of every coordinate.
+HEADER = struct.Struct("<4sHBBII")
+ENCODINGS = ("coord-u8",)
+UNKNOWN = 0xff
+
+
+def default_path(metric="quarter"):
+    """Return the default location of the table file for a metric."""
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), f"distances_{metric}.bin")
+
+
+class DistanceTable:
+    """
+    The distance to the solved cube of every coordinate.
+
+    The distances can be held by any object indexed by coordinates
+    returning integers, such as bytes or a numpy array.
+    """
+    def __init__(self, data, metric="quarter"):
+        """
+        Wraps an existing table.
+
+        :param data: The distance of every coordinate, indexed by coordinate
+        :param metric: The move metric of the table, a key of METRICS
+        """
+        self.data = data
+        self.metric = metric
+        self.moves = METRICS[metric]
+
+    @classmethod
+    def build(cls, metric="quarter"):
+        """
+        Generates the table by breadth first search from the solved cube.
+
+        All moves are applied to a whole depth of the search at once
+        using numpy versions of the coordinate move tables.
+        """
+        tables = [(np.asarray(perm, dtype=np.int64), np.asarray(twist, dtype=np.int64))
+                  for perm, twist in move_tables(METRICS[metric])]
+
+        data = np.full(N_STATES, UNKNOWN, dtype=np.uint8)
+        data[SOLVED] = 0
+        frontier = np.array([SOLVED], dtype=np.int64)
+        depth = 0
+        while frontier.size:
+            depth += 1
+            p, t = np.divmod(frontier, N_TWIST)
+            found = []
+            for perm, twist in tables:
+                n = perm[p] * N_TWIST + twist[t]
+                n = n[data[n] == UNKNOWN]
+                data[n] = depth
+                found.append(n)
+            frontier = np.unique(np.concatenate(found))
+        assert not (data == UNKNOWN).any()
+        return cls(data, metric)
+
+    @classmethod
+    def load(cls, path=None, metric="quarter", verify=True):
+        """
+        Memory maps a table written by save.
+
+        :param path: The table file, by default default_path(metric)
+        :param verify: Whether to check the checksum of the data, which
+                       reads the whole file once
+        :raises ValueError: If the file is not a valid table
+        """
+        if path is None:
+            path = default_path(metric)
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < HEADER.size:
+                raise ValueError(f"{path} is not a distance table")
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, metric, encoding, count, checksum = HEADER.unpack_from(mm)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} distance table")
+        if metric >= len(METRICS) or encoding >= len(ENCODINGS) or count != N_STATES:
+            raise ValueError(f"{path} has an unsupported layout")
+        data = memoryview(mm)[HEADER.size:]
+        if len(data) != count:
+            raise ValueError(f"{path} is truncated")
+        if verify and zlib.crc32(data) != checksum:
+            raise ValueError(f"{path} is corrupt")
+        return cls(data, list(METRICS)[metric])
+
+    def save(self, path=None):
+        """Writes the table to a file, by default default_path(self.metric)."""
+        if path is None:
+            path = default_path(self.metric)
+        data = bytes(self.data)
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, list(METRICS).index(self.metric),
+                                ENCODINGS.index("coord-u8"), len(data), zlib.crc32(data)))
+            f.write(data)
+        _load_table.cache_clear()
+
+    def distance(self, coord):
+        """Return the number of moves required to solve a coordinate."""
+        return self.data[coord]
+
+    def solution(self, coord):
+        """
+        Find the minimal operations required to solve a coordinate.
+
+        :returns: The string sequence of operations that solves the cube.
+        """
+        acc = ""
+        depth = self.data[coord]
+        while depth:
+            for m in self.moves:
+                n = move_str(coord, m)
+                if self.data[n] < depth:
+                    acc += m
+                    coord = n
+                    depth -= 1
+                    break
+        return acc
+
+    def histogram(self):
+        """Return the number of states at every distance."""
+        return np.bincount(np.frombuffer(bytes(self.data), dtype=np.uint8)).tolist()
+
+
+@lru_cache(maxsize=None)
+def _load_table(path, metric):
+    return DistanceTable.load(path, metric)
+
+def open_table(path=None, metric="quarter"):
+    """
+    Load a table once per process.
+
+    Failures are not remembered, so a table written later is picked up.
+
+    :returns: The DistanceTable, or None if the file is missing or invalid
+    """
+    try:
+        return _load_table(path, metric)
+    except (OSError, ValueError) as e:
+        warnings.warn(f"distance table unavailable, falling back to search: {e}")
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a 2x2 distance table.")
+    parser.add_argument("path", nargs="?", help="output file, defaults to the package directory")
+    parser.add_argument("--metric", choices=METRICS, default="quarter")
+    args = parser.parse_args()
+    table = DistanceTable.build(args.metric)
+    table.save(args.path)
+    for depth, count in enumerate(table.histogram()):
+        print(f"{depth:3}{count:>10}")
+
+if __name__ == "__main__":
+    main()
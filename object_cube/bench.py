@@ -0,0 +1,56 @@
+"""
+Benchmarks of the object-oriented 2x2 rubiks cube solvers.
+
+Compares the memory and the throughput of node.Solver, which copies a Cube
+for every node, with fast.FastSolver.
+
+Run with python -m object_cube.bench
+"""
+
+import tracemalloc
+from random import Random
+from time import perf_counter
+
+from .cube import Cube
+from .fast import FastCube, FastSolver
+from .node import Solver
+
+
+def scramble(depth, seed=0):
+    """Return a random sequence of depth roll operations without immediate inverses."""
+    rng = Random(seed)
+    s = ""
+    while len(s) < depth:
+        i = rng.choice("LlFfRrBbUuDd")
+        if not s or i != s[-1].swapcase():
+            s += i
+    return s
+
+def measure(solver_class, cube_class, string):
+    """
+    Solve a scrambled cube, measuring the time and the peak memory of the search.
+
+    :returns: A tuple of the seconds taken, the peak traced bytes,
+              the number of visited states and the solution length
+    """
+    cube = cube_class()
+    cube.roll_str(string)
+    tracemalloc.start()
+    start = perf_counter()
+    solver = solver_class(cube)
+    solution = solver.solve()
+    elapsed = perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, len(solver.nodes), len(solution)
+
+def main():
+    print(f"{'depth':>5}{'solver':>12}{'states':>10}{'seconds':>10}{'states/s':>12}{'peak MB':>10}")
+    for depth in (2, 3, 4):
+        string = scramble(depth, seed=depth)
+        for name, solver, cube in (("Solver", Solver, Cube), ("FastSolver", FastSolver, FastCube)):
+            t, peak, states, _ = measure(solver, cube, string)
+            print(f"{depth:>5}{name:>12}{states:>10,}{t:>10.3f}{states / t:>12,.0f}{peak / 2**20:>10.2f}")
+
+if __name__ == "__main__":
+    main()
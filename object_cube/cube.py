@@ -1,5 +1,6 @@
 from random import choice, randrange
 import numpy as np
+from bit_cube.engine import MoveCompiler
 
 class Cube:
     """
@@ -33,6 +34,10 @@ class Cube:
     dir_map = {"L": (L, 1), "F": (F, 1), "R": (R, 1), "B": (B, 1), "U": (U, 1), "D": (D, 1),
                "l": (L, -1), "f": (F, -1), "r": (R, -1), "b": (B, -1), "u": (U, -1), "d": (D, -1)}
     color_map = {WHITE: "0", RED: "1", BLUE: "2", ORANGE: "3", GREEN: "4", YELLOW:"5"}
+    KEY_WEIGHTS = np.int64(6) ** np.arange(23, -1, -1, dtype=np.int64)
+    # The colors in sorted order and their digits, so np.searchsorted reads the digits of a whole array.
+    _KEY_COLORS = np.array(sorted(color_map))
+    _KEY_DIGITS = np.array([int(d) for _, d in sorted(color_map.items())], dtype=np.int64)
 
     def _init_consts(self):
         self.strsize  = (self.SIZE[1]*3, self.SIZE[0]*4)
@@ -78,11 +83,28 @@ class Cube:
 
     def hash_state(self):
         """Hashes the current state of the cube."""
-        it = np.nditer(self.array, flags=["common_dtype"])
-        ret = "".join((i.item() for i in it))
-        for k, v in self.color_map.items():
-            ret = ret.replace(k, v)
-        return ret
+        return "".join(map(self.color_map.__getitem__, self.array.ravel().tolist()))
+
+    def key_state(self):
+        """
+        Pack the current state of the cube into a single integer.
+
+        The digits of hash_state are read as a base 6 number with a single
+        dot product, so the key is below 6**24 and fits in 63 bits, and
+        key_state() == int(hash_state(), 6).
+        """
+        return int(self._KEY_DIGITS[np.searchsorted(self._KEY_COLORS, self.array.ravel())] @ self.KEY_WEIGHTS)
+
+    @classmethod
+    def key_states(cls, cubes):
+        """
+        Pack the states of several cubes into integers, see key_state.
+
+        :param cubes: A sequence of Cube objects
+        :returns: A uint64 array of the keys of the cubes
+        """
+        arrays = np.array([c.array for c in cubes]).reshape(-1, 24)
+        return (cls._KEY_DIGITS[np.searchsorted(cls._KEY_COLORS, arrays)] @ cls.KEY_WEIGHTS).astype(np.uint64)
 
     def __eq__(self, obj):
         """
@@ -220,11 +242,12 @@ class Cube:
         f, b, l, r, u, d represents an anticlockwise rotation to the front, back, left, right,
         upward, downward faces of the cube respectively.
 
+        The whole string is applied as a single permutation, see ROLL_COMPILER.
+
         :param string: A string where each character represents a roll operation on the cube.
                        Cannot contain any other characters other than the 12 specified above.
         """
-        for i in string:
-            self.roll(*self.dir_map[i])
+        self.array = self.array.ravel()[ROLL_COMPILER.compile(string)].reshape(6, *self.SIZE)
 
 
     def rot(self, face, direction):
@@ -244,11 +267,11 @@ class Cube:
             self.array[4] = np.rot90(self.array[4], k=-direction)
             self.array[5] = np.rot90(self.array[5], k=direction)
         elif face == self.L:
-            sl = [self.array[self.F], self.array[self.D], self.array[self.B, ::-1], self.array[self.U]]
+            sl = [self.array[self.F], self.array[self.D], self.array[self.B, ::-1, ::-1], self.array[self.U]]
             sl = np.roll(sl, direction, axis=0)
             self.array[self.F] = sl[0]
             self.array[self.D] = sl[1]
-            self.array[self.B, ::-1] = sl[2]
+            self.array[self.B, ::-1, ::-1] = sl[2]
             self.array[self.U] = sl[3]
             self.array[self.L] = np.rot90(self.array[self.L], k=-direction)
             self.array[self.R] = np.rot90(self.array[self.R], k=direction)
@@ -275,8 +298,30 @@ class Cube:
         u, l, f represents an anticlockwise rotation along the upward, leftward, frontward
         faces of the cube respectively.
 
+        The whole string is applied as a single permutation, see ROT_COMPILER.
+
         :param string: A string where each character represents a rotation operation on the cube.
                        Cannot contain any other characters other than the 6 specified above.
         """
-        for i in string:
-            self.rot(*self.dir_map[i])
+        self.array = self.array.ravel()[ROT_COMPILER.compile(string)].reshape(6, *self.SIZE)
+
+
+def tile_perm(method, *args):
+    """
+    Extract the tile permutation performed by a method of Cube.
+
+    :returns: A tuple p such that tile i of the flattened result is tile p[i] of the original
+    """
+    c = Cube.__new__(Cube)
+    c.array = np.arange(24).reshape(6, *Cube.SIZE)
+    method(c, *args)
+    return tuple(c.array.ravel().tolist())
+
+def _frozen(p):
+    ret = np.array(p)
+    ret.flags.writeable = False
+    return ret
+
+# Compilers of move strings into single cached permutations, see Cube.roll_str and Cube.rot_str.
+ROLL_COMPILER = MoveCompiler({k: tile_perm(Cube.roll, *v) for k, v in Cube.dir_map.items()}, _frozen)
+ROT_COMPILER = MoveCompiler({k: tile_perm(Cube.rot, *Cube.dir_map[k]) for k in "LlFfUu"}, _frozen)
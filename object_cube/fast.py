@@ -0,0 +1,309 @@
+"""
+A lean, copy-free version of the object-oriented 2x2 rubiks cube and its solver.
+
+FastCube keeps the API of Cube, but stores its tiles as a bytearray of color
+codes and turns them in place through precomputed tile permutations shared
+by every instance. FastNode only references its parent and the move reaching
+it, and FastSolver explores states by rolling and unrolling a single cube
+instead of copying one per node.
+"""
+
+from collections import deque
+from operator import itemgetter
+from random import choice, randrange
+from time import perf_counter
+
+from bit_cube.engine import MoveCompiler
+from bit_cube import convert as _convert
+from bit_cube.coord import solvable
+from bit_cube.instrument import LevelStats, estimate_memory
+from bit_cube.solver import Solver as _BitSolver
+
+from .cube import Cube, ROLL_COMPILER, ROT_COMPILER
+
+
+class FastCube:
+    """
+    A 2x2 Rubiks Cube implemented using a bytearray of color codes.
+    """
+    __slots__ = ("array",)
+
+    L, F, R, B, U, D = Cube.L, Cube.F, Cube.R, Cube.B, Cube.U, Cube.D
+    SIZE = Cube.SIZE
+    dir_map = Cube.dir_map
+
+    # Color codes, matching the digits of Cube.hash_state.
+    COLORS = (Cube.WHITE, Cube.RED, Cube.BLUE, Cube.ORANGE, Cube.GREEN, Cube.YELLOW)
+    WHITE, RED, BLUE, ORANGE, GREEN, YELLOW = range(6)
+    NEW = bytes(x for x in (ORANGE, GREEN, RED, YELLOW, WHITE, BLUE) for _ in range(4))
+
+    # Item getters performing every roll and rotation, indexed by face and direction % 4.
+    # Their result is a tuple, so the array is permuted in place by assigning it to a slice.
+    _ROLL = {f: tuple(itemgetter(*ROLL_COMPILER.perm(k * d)) for d in range(4)) for f, k in zip(range(6), "LFRBUD")}
+    _ROT = {f: tuple(itemgetter(*ROT_COMPILER.perm(k * d)) for d in range(4)) for f, k in ((L, "L"), (F, "F"), (U, "U"))}
+    # Item getters performing whole move strings, see roll_str.
+    _ROLL_STR = MoveCompiler(ROLL_COMPILER.perms, lambda p: itemgetter(*p))
+    _ROT_STR = MoveCompiler(ROT_COMPILER.perms, lambda p: itemgetter(*p))
+
+    def __init__(self, randomize=False):
+        """
+        Creates a new 2x2 rubiks cube.
+
+        :param randomize: Boolean specifying whether to randomize
+                          the cube on initialization
+        """
+        self.array = bytearray(self.NEW)
+        if bool(randomize):
+            self.randomize()
+
+    @classmethod
+    def from_cube(cls, cube):
+        """Create a FastCube with the same tiles as a Cube."""
+        ret = cls.__new__(cls)
+        ret.array = bytearray(int(x) for x in cube.hash_state())
+        return ret
+
+    def copy(self):
+        """Return an independent copy of the cube."""
+        ret = self.__class__.__new__(self.__class__)
+        ret.array = bytearray(self.array)
+        return ret
+
+    def hash_state(self):
+        """Hashes the current state of the cube."""
+        return bytes(self.array)
+
+    def __eq__(self, obj):
+        """
+        Check if obj is equal to the cube.
+
+        The rubiks cubes are not rotation invariant. Therefore, a rotated
+        cube is not guarenteed to be equal to its original cube.
+        """
+        if not isinstance(obj, FastCube): return False
+        return self.array == obj.array
+
+    __hash__ = None
+
+    def randomize(self, moves=500):
+        """
+        Randomizes the rubiks cube.
+
+        :param moves: Integer representing the number of random moves to be applied to the cube
+        """
+        for i in range(randrange(moves)):
+            self.roll(choice([self.L, self.F, self.R, self.B, self.U, self.D]), randrange(1, 3))
+
+    def __str__(self):
+        """
+        Return a ascii color coded string representation of a cube.
+
+        See Cube.__str__ for the layout.
+        """
+        c = [self.COLORS[x] for x in self.array]
+        t = lambda f, r: c[4*f + 2*r] + c[4*f + 2*r + 1]
+        lines = ["  " + t(self.U, 0), "  " + t(self.U, 1),
+                 "".join(t(f, 0) for f in (self.L, self.F, self.R, self.B)),
+                 "".join(t(f, 1) for f in (self.L, self.F, self.R, self.B)),
+                 "  " + t(self.D, 0), "  " + t(self.D, 1)]
+        return "\n".join(lines)
+
+    def roll(self, face, direction):
+        """
+        Perform a roll operation on a specific face of the rubiks cube, in place.
+
+        :param face: An integer that represents the face to be rotated
+        :param direction: The number of 90 degree clockwise rotations
+                          performed on the cube. Negative numbers
+                          represent anticlockwise rotations.
+        """
+        self.array[:] = self._ROLL[face][direction % 4](self.array)
+
+    def unroll(self, face, direction):
+        """Undo a roll operation, see roll."""
+        self.array[:] = self._ROLL[face][-direction % 4](self.array)
+
+    def roll_str(self, string):
+        """
+        Perform roll operations on the cube based on a sequence of characters in a string.
+
+        :param string: A string where each character represents a roll operation on the cube.
+                       See Cube.roll_str.
+        """
+        self.array[:] = self._ROLL_STR.compile(string)(self.array)
+
+    def unroll_str(self, string):
+        """Undo the roll operations of a string, see roll_str."""
+        self.roll_str(string[::-1].swapcase())
+
+    def rot(self, face, direction):
+        """
+        Rotate the cube 90 degrees in relation to one of the faces of the cube, in place.
+
+        :param face: An intiger representing a face which specifies
+                     the axis which the cube is rotated along
+        :param direction: The number of 90 degrees clockwise rotations performed
+                          on the cube. Negative numbers represent anticlockwise
+                          rotations.
+        """
+        self.array[:] = self._ROT[face][direction % 4](self.array)
+
+    def rot_str(self, string):
+        """
+        Perform rotation operations on the cube based on a sequence of characters in a string.
+
+        :param string: A string where each character represents a rotation operation on the cube.
+                       See Cube.rot_str.
+        """
+        self.array[:] = self._ROT_STR.compile(string)(self.array)
+
+
+class FastNode:
+    """A node representing a single cube state for bfs, referencing only its parent."""
+    __slots__ = ("state", "parent", "move")
+
+    def __init__(self, state, parent=None, move=None):
+        self.state = state
+        self.parent = parent
+        self.move = move
+
+    @property
+    def bk(self):
+        """The list of moves leading from the root node to this node."""
+        bk = []
+        node = self
+        while node.parent is not None:
+            bk.append(node.move)
+            node = node.parent
+        bk.reverse()
+        return bk
+
+
+class FastSolver:
+    """
+    An object-oriented rubiks cube solver based on bfs.
+
+    Unlike Solver, nodes hold the bytes of a state rather than a copy of a
+    cube, and neighbouring states are generated by rolling and unrolling a
+    single working cube.
+    """
+    op = ["L", "l", "F", "f", "R", "r", "B", "b", "U", "u", "D", "d"]
+
+    def __init__(self, cube, observer=None):
+        """
+        Initialize a solver for a specific cube.
+
+        :param cube: The FastCube, or Cube, to be solved.
+        :param observer: An optional bit_cube.instrument.Observer notified
+                         of the progress of the search after every depth.
+        """
+        self.observer = observer
+        if not isinstance(cube, FastCube):
+            cube = FastCube.from_cube(cube)
+        self.cube = cube.copy()
+        self.org = cube.copy()
+        self._init_final()
+        root = FastNode(self.cube.hash_state())
+        self.nodes = {root.state: root}
+        self.queue = deque([root])
+
+    def _init_final(self):
+        """
+        Initializes the final states of the graph.
+
+        As the cube is not rotation invariant, every rotation
+        of the completed cube is a final state.
+        """
+        self.final = set()
+        for i in ["", "L", "l", "F", "f", "LL"]:
+            c = FastCube()
+            c.rot_str(i)
+            for j in range(0, 4):
+                c.rot(c.U, 1)
+                self.final.add(c.hash_state())
+
+    def solve(self):
+        """
+        Find the minimal operations required to solve the rubiks cube.
+
+        :returns: The list of operations that solves the cube,
+                  or None if the cube cannot be solved.
+        """
+        if not solvable(_convert.object_to_bit(self.org)): return None
+        if self.observer is not None:
+            self.observer.on_start(self, "bfs")
+        s = [] if self.queue[0].state in self.final else None
+        depth = 0
+        while s is None and self.queue:
+            frontier, self.queue = self.queue, deque()
+            if self.observer is not None:
+                start, visited = perf_counter(), len(self.nodes)
+            for expanded, node in enumerate(frontier, 1):
+                s = self.expand(node)
+                if s is not None: break
+            if self.observer is not None:
+                generated = expanded * len(self.op)
+                new = len(self.nodes) - visited
+                self.observer.on_level(self, LevelStats(depth, expanded, generated, generated - new, len(self.queue),
+                                                        len(self.nodes), perf_counter() - start,
+                                                        estimate_memory(self.nodes, list(self.queue))))
+            depth += 1
+        if self.observer is not None:
+            self.observer.on_finish(self, s)
+        return s
+
+    def solve_iter(self):
+        """
+        Find every optimal solution of the rubiks cube, lazily.
+
+        The breadth first search keeps a single parent for every node and stops
+        at the first solution, so it cannot enumerate the others. The cube is
+        instead converted to the integer representation and searched by
+        bit_cube, see bit_cube.solver.Solver.solve_iter.
+
+        :returns: A generator of LevelStats after every depth of the search,
+                  followed by the lists of operations solving the cube.
+        """
+        for event in _BitSolver(_convert.object_to_bit(self.org)).solve_iter():
+            yield list(event) if isinstance(event, str) else event
+
+    def search(self):
+        """
+        Performs an iteration of the breadth first search, expanding the first queued node.
+
+        :returns: The list of operations that solves the cube if it was found, otherwise None.
+        """
+        return self.expand(self.queue.popleft())
+
+    def expand(self, node):
+        """
+        Generates and searches all adjacent nodes to a node for the finished state.
+
+        The working cube is set to the node, and every move is applied
+        to it and undone after hashing the result. New nodes are queued.
+        """
+        cube = self.cube
+        cube.array[:] = node.state
+        for s in self.op:
+            face, direction = cube.dir_map[s]
+            cube.roll(face, direction)
+            h = cube.hash_state()
+            cube.unroll(face, direction)
+            if h not in self.nodes:
+                child = FastNode(h, node, s)
+                self.nodes[h] = child
+                if h in self.final:
+                    return child.bk
+                self.queue.append(child)
+
+    def solve_by_depth(self, i):
+        """
+        Find the minimum operations required to solve the rubiks cube until it reaches a maximum depth.
+
+        :param i: An integer representing the maximum depth of the search.
+        :returns: The list of operations that solves the cube.
+        """
+        while self.queue and len(self.queue[0].bk) <= i:
+            s = self.search()
+            if s is not None:
+                return s
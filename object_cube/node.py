@@ -1,15 +1,16 @@
-from cube import Cube
-from cube2d import Cube2D
 from copy import deepcopy
 
+from bit_cube import convert as _convert
+from bit_cube.solver import Solver as _BitSolver
+
 
 class Node:
     """A node object representing a single cube state for bfs."""
-    def __init__(self, cube, bk = [], edges = {}, final = False):
+    def __init__(self, cube, bk = None, edges = None, final = False):
         self._cube = deepcopy(cube)
-        self.edges = {}
+        self.edges = {} if edges is None else edges
         self.final = final
-        self.bk = bk
+        self.bk = [] if bk is None else bk
 
     @property
     def cube(self):
@@ -20,7 +21,8 @@ class Solver:
     A object-oriented rubiks cube solver based on bfs.
 
     This implementation uses objects to represent cubes and nodes, which
-    uses a lot of memory and is thus very slow.
+    uses a lot of memory and is thus very slow. It is kept as the baseline
+    of the comparisons, see fast.FastSolver for the compact version.
     """
 
     def __init__(self, cube):
@@ -31,9 +33,10 @@ class Solver:
         """
         #assert isinstance(cube, Cube)
         self.nodes = {}
+        self.org = cube
         self.type = type(cube)
         self._init_final()
-        self.start = cube.hash_state()
+        self.start = cube.key_state()
         try:
             self.nodes[self.start]
         except KeyError:
@@ -54,8 +57,7 @@ class Solver:
             c.rot_str(i)
             for j in range(0,4):
                 c.rot(c.U, 1)
-                print(c.hash_state())
-                self.nodes[c.hash_state()] = Node(c, final = True)
+                self.nodes[c.key_state()] = Node(c, final = True)
         #self._assert_unique(self.nodes.keys())
 
     def _assert_unique(self, cubes):
@@ -68,13 +70,27 @@ class Solver:
 
         :returns: The string sequence of operations that solves the cube.
         """
-        print("starting solve")
         while self.queue:
             s = self.search()
             if s is not None: return s
             #print("finish while")
         #print("what")
 
+    def solve_iter(self):
+        """
+        Find every optimal solution of the rubiks cube, lazily.
+
+        The breadth first search stops at the first solution and keeps a single
+        path to every node, so it cannot enumerate the others. The cube is
+        instead converted to the integer representation and searched by
+        bit_cube, see bit_cube.solver.Solver.solve_iter.
+
+        :returns: A generator of LevelStats after every depth of the search,
+                  followed by the lists of operations solving the cube.
+        """
+        for event in _BitSolver(_convert.object_to_bit(self.org)).solve_iter():
+            yield list(event) if isinstance(event, str) else event
+
     def search(self):
         """
         Performs an iteration of the depth first search.
@@ -91,8 +107,9 @@ class Solver:
         for s in op:
             cu = node.cube
             cu.roll_str(s)
-            try:  # TODO: Make it more efficient
-                cunode = self.nodes[cu.hash_state()]
+            key = cu.key_state()
+            try:
+                cunode = self.nodes[key]
                 if cunode.final:
                     bk = node.bk
                     bk.append(s)
@@ -107,7 +124,7 @@ class Solver:
                 bk.append(s)
                 #print(bk)
                 cunode = Node(cu, bk=bk)#, edges = {s.swapcase(): node})
-                self.nodes[cu.hash_state()] = cunode
+                self.nodes[key] = cunode
                 node.edges[s] = cunode
                 self.queue.append(cunode)
 
@@ -121,5 +138,4 @@ class Solver:
         while len(self.queue[0].bk) <= i:
             s = self.search()
             if s is not None:
-                print(s)
                 return s
@@ -0,0 +1,19 @@
+import pytest
+
+from bit_cube.coord import read_corners, write_corners
+from bit_cube.engine import roll_str
+from bit_cube.manipulations import NEW
+from bit_cube.table import DistanceTable
+
+
+@pytest.fixture(scope="session")
+def table():
+    """The distance table of the quarter turn metric, built once per test run."""
+    return DistanceTable.build()
+
+@pytest.fixture
+def twisted():
+    """A scrambled cube with a single corner twisted, which no sequence of moves solves."""
+    perm, twist = read_corners(roll_str(NEW, "LF"))
+    twist[0] = (twist[0] + 1) % 3
+    return write_corners(perm, twist)
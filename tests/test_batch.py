@@ -0,0 +1,29 @@
+import pytest
+
+from bit_cube.batch import solve_many
+from bit_cube.coord import recolor
+from bit_cube.engine import roll_str
+from bit_cube.manipulations import NEW
+from bit_cube.scramble import random_cubes
+
+
+def _check(results, cubes):
+    assert sorted(i for i, _ in results) == list(range(len(cubes)))
+    for i, s in results:
+        assert recolor(roll_str(cubes[i], s)) == NEW
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_solve_many_with_table(table, ordered):
+    cubes = random_cubes(100, 0, rotate=True)
+    results = list(solve_many(iter(cubes), workers=2, table=table, ordered=ordered, chunksize=7))
+    _check(results, cubes)
+    if ordered:
+        assert [i for i, _ in results] == list(range(len(cubes)))
+    serial = dict(solve_many(cubes, workers=1, table=table))
+    assert [len(s) for _, s in sorted(results)] == [len(serial[i]) for i in range(len(cubes))]
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_solve_many_without_table(ordered):
+    cubes = [roll_str(NEW, s) for s in ("", "LFu", "RBdLU", "FrDbUlfR")]
+    results = list(solve_many(cubes, workers=2, table=False, ordered=ordered, chunksize=1, max_pending=1))
+    _check(results, cubes)
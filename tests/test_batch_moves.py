@@ -0,0 +1,26 @@
+from random import Random
+
+import numpy as np
+import pytest
+
+from array_cube.manipulations import new_cube, roll_batch, roll_str, rot_batch, rot_str
+
+
+def _cubes(n, rng):
+    return np.array([roll_str(new_cube(), "".join(rng.choice("LlFfRrBbUuDd") for _ in range(20)))
+                     for _ in range(n)])
+
+@pytest.mark.parametrize("batch, scalar, moves", [(roll_batch, roll_str, "LlFfRrBbUuDd"),
+                                                  (rot_batch, rot_str, "LlFfUu")])
+def test_batch_matches_scalar(batch, scalar, moves):
+    rng = Random(0)
+    cubes = _cubes(20, rng)
+    string = "".join(rng.choice(moves) for _ in range(10))
+    expected = np.array([scalar(c, string) for c in cubes])
+    assert np.array_equal(batch(cubes, string), expected)
+    per_cube = [rng.choice(moves) for _ in cubes]
+    expected = np.array([scalar(c, m) for c, m in zip(cubes, per_cube)])
+    assert np.array_equal(batch(cubes, per_cube), expected)
+    flat = cubes.reshape(-1, 24).copy()
+    assert batch(flat, per_cube, out=flat) is flat
+    assert np.array_equal(flat.reshape(cubes.shape), expected)
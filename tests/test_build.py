@@ -0,0 +1,27 @@
+import numpy as np
+
+from bit_cube import build
+from bit_cube.coord import N_STATES
+
+
+def test_parallel_build_matches_serial(table):
+    built = build.build(workers=2, shards=5)
+    assert np.array_equal(built.data, np.asarray(table.data))
+    assert build.verify(built) == []
+    assert build.checksum(built) == build.checksum(table)
+
+def test_build_resumes_from_checkpoint(table, tmp_path):
+    path = str(tmp_path / "table.ckpt")
+    data = np.asarray(table.data).copy()
+    # A checkpoint of the first five depths, as left by an interrupted build.
+    data[data > 5] = build.UNKNOWN
+    build.save_checkpoint(path, data, "quarter", 5)
+    depths = []
+    built = build.build(workers=2, checkpoint=path, log=lambda depth, count: depths.append(depth))
+    assert depths[0] == 6
+    assert np.array_equal(built.data, np.asarray(table.data))
+
+def test_verify_reports_wrong_distances(table):
+    data = np.asarray(table.data).copy()
+    data[N_STATES - 1] += 1
+    assert build.verify(build.DistanceTable(data)) != []
@@ -0,0 +1,28 @@
+from bit_cube.cache import SolutionCache
+from bit_cube.coord import read_corners, write_corners
+from bit_cube.engine import roll_str
+from bit_cube.manipulations import NEW
+
+
+def test_entries_are_written_when_added(tmp_path):
+    path = str(tmp_path / "cache.txt")
+    cache = SolutionCache(16, path)
+    s = cache.solve(roll_str(NEW, "LFu"))
+    assert s is not None
+    # Read while the cache is still open, as after a crash.
+    assert len(SolutionCache(16, path)) == 1
+    cache.close()
+
+def test_unsolvable_cube_is_not_answered_from_the_cache():
+    # A cube with one corner twisted, and the cubes also twisting another
+    # corner back, which differ from it only in twists the coordinate leaves out.
+    perm, twist = read_corners(roll_str(NEW, "LF"))
+    twist[0] = (twist[0] + 1) % 3
+    twisted = write_corners(perm, twist)
+    cache = SolutionCache(16)
+    for k in range(1, 8):
+        t = list(twist)
+        t[k] = (t[k] - 1) % 3
+        assert cache.solve(write_corners(perm, t)) is not None
+    assert cache.get(twisted) is None
+    assert cache.solve(twisted) is None
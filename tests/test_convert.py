@@ -0,0 +1,5 @@
+from bit_cube.convert import conformance
+
+
+def test_representations_agree():
+    assert conformance(n=20) == []
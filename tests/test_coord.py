@@ -0,0 +1,25 @@
+from random import Random
+
+import pytest
+
+from bit_cube.coord import N_STATES, SOLVED, from_coord, read_corners, to_coord, write_corners
+from bit_cube.manipulations import NEW
+
+
+def test_round_trip():
+    rng = Random(0)
+    for coord in [SOLVED, N_STATES - 1] + [rng.randrange(N_STATES) for _ in range(200)]:
+        assert to_coord(from_coord(coord)) == coord
+    assert from_coord(SOLVED) == NEW
+
+def test_single_twisted_corner_is_rejected():
+    perm, twist = read_corners(NEW)
+    twist[0] = (twist[0] + 1) % 3
+    with pytest.raises(ValueError):
+        to_coord(write_corners(perm, twist))
+
+def test_repeated_corner_is_rejected():
+    perm, twist = read_corners(NEW)
+    perm[0] = perm[2]
+    with pytest.raises(ValueError):
+        to_coord(write_corners(perm, twist))
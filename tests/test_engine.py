@@ -0,0 +1,19 @@
+import pytest
+
+from array_cube import manipulations as array_manipulations
+from bit_cube import engine
+from object_cube import cube as object_cube
+
+
+@pytest.mark.parametrize("compiler", [engine.ROT_COMPILER, array_manipulations.ROT_COMPILER,
+                                      object_cube.ROT_COMPILER])
+def test_compile_rejects_unknown_moves(compiler):
+    with pytest.raises(ValueError):
+        compiler.compile("LX")
+    compiler.compile("LflU")
+
+def test_compile_rejects_moves_missing_from_the_compiler():
+    with pytest.raises(ValueError):
+        object_cube.ROT_COMPILER.compile("R")
+    with pytest.raises(ValueError):
+        object_cube.ROT_COMPILER.perm("uR")
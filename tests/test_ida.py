@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+
+from bit_cube.coord import from_coord, recolor, to_coord
+from bit_cube.engine import roll_str
+from bit_cube.manipulations import NEW
+from bit_cube.solver import IDASolver
+
+
+@pytest.mark.parametrize("depth", range(0, 13))
+def test_solutions_are_optimal(table, depth):
+    distances = np.frombuffer(bytes(table.data), dtype=np.uint8)
+    rng = np.random.default_rng(depth)
+    for coord in rng.choice(np.flatnonzero(distances == depth), 2).tolist():
+        cube = from_coord(coord)
+        s = IDASolver(cube).solve()
+        assert len(s) == depth
+        assert to_coord(recolor(roll_str(cube, s))) == 0
+
+def test_unsolvable_cube(twisted):
+    assert IDASolver(twisted).solve() is None
+    assert IDASolver(roll_str(NEW, "LF")).solve() == "fl"
@@ -0,0 +1,29 @@
+from random import Random
+
+import numpy as np
+
+from array_cube import manipulations as array_manipulations
+from object_cube.cube import Cube
+
+
+def _scrambled(rng):
+    c = Cube()
+    c.roll_str("".join(rng.choice("LlFfRrBbUuDd") for _ in range(20)))
+    return c
+
+def test_object_keys_read_the_hash_in_base_6():
+    rng = Random(0)
+    cubes = [Cube()] + [_scrambled(rng) for _ in range(50)]
+    keys = [c.key_state() for c in cubes]
+    assert keys == [int(c.hash_state(), 6) for c in cubes]
+    assert Cube.key_states(cubes).tolist() == keys
+    assert len(set(keys)) == len(keys)
+
+def test_array_keys_read_the_hash_in_base_6():
+    rng = Random(0)
+    cubes = np.array([array_manipulations.roll_str(array_manipulations.new_cube(),
+                                                   "".join(rng.choice("LlFfRrBbUuDd") for _ in range(20)))
+                      for _ in range(50)])
+    keys = [array_manipulations.key_cube(c) for c in cubes]
+    assert keys == [int(array_manipulations.hash_cube(c), 6) for c in cubes]
+    assert array_manipulations.key_cubes(cubes).tolist() == keys
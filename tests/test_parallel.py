@@ -0,0 +1,26 @@
+import numpy as np
+
+from bit_cube.coord import SOLVED, from_coord, move
+from bit_cube.instrument import SearchStats
+from bit_cube.parallel import ParallelSearch
+from bit_cube.solver import Solver
+
+
+def test_parallel_search_matches_serial(table):
+    distances = np.frombuffer(bytes(table.data), dtype=np.uint8)
+    rng = np.random.default_rng(0)
+    coords = [SOLVED] + [int(rng.choice(np.flatnonzero(distances == d))) for d in (1, 4, 8, 10)]
+    with ParallelSearch(3) as search:
+        for coord in coords:
+            levels = []
+            s = search.search(coord, levels.append)
+            assert len(s) == distances[coord]
+            c = coord
+            for m in s:
+                c = move(c, m)
+            assert c == SOLVED
+            assert len(Solver(from_coord(coord), workers=search).solve()) == len(s)
+            stats = SearchStats()
+            assert len(Solver(from_coord(coord), compact=True, observer=stats).solve()) == len(s)
+            # Both searches find the same new states at every depth before the last.
+            assert [l.frontier for l in levels[:-1]] == [l.frontier for l in stats.levels[:-1]]
@@ -0,0 +1,19 @@
+import pytest
+
+from bit_cube.coord import N_STATES, recolor, solvable, to_coord
+from bit_cube.scramble import random_cube, random_cubes
+
+
+@pytest.mark.parametrize("rotate", [False, True])
+def test_scrambles_are_solvable(rotate):
+    cubes = random_cubes(500, 0, rotate) + [random_cube(seed, rotate) for seed in range(50)]
+    assert all(solvable(c) for c in cubes)
+    assert all(0 <= to_coord(recolor(c)) < N_STATES for c in cubes)
+
+def test_scrambles_without_rotation_keep_the_fixed_corner():
+    for c in random_cubes(100, 1):
+        assert recolor(c) == c
+
+def test_scrambles_are_reproducible():
+    assert random_cubes(20, 7) == random_cubes(20, 7)
+    assert random_cube(7, True) == random_cube(7, True)
@@ -0,0 +1,64 @@
+import asyncio
+import json
+
+import pytest
+
+from bit_cube.cache import SolutionCache
+from bit_cube.service import SolveService
+
+
+@pytest.fixture(params=[None, 16], ids=["no cache", "cache"])
+def service(table, request):
+    cache = None if request.param is None else SolutionCache(request.param)
+    s = SolveService(workers=1, table=table, cache=cache)
+    s.start()
+    yield s
+    s.close()
+
+def _handle(service, *requests):
+    async def run():
+        return [await service.handle(r if isinstance(r, str) else json.dumps(r)) for r in requests]
+    return asyncio.run(run())
+
+def test_errors(service, twisted):
+    responses = _handle(service, "{", "[1]", {"id": 1}, {"id": 2, "cube": -1}, {"id": 3, "scramble": "LX"},
+                        {"id": 4, "cube": twisted}, {"id": 5, "cube": 5})
+    assert responses[0]["error"].startswith("invalid request")
+    assert responses[1] == {"error": "invalid request: request must be an object"}
+    assert responses[2] == {"id": 1, "error": "request holds neither a cube nor a scramble"}
+    assert responses[3] == {"id": 2, "error": "cube must be the integer representation of a cube"}
+    assert responses[4]["id"] == 3 and "error" in responses[4]
+    assert responses[5] == {"id": 4, "error": "unsolvable cube"}
+    assert responses[6] == {"id": 5, "error": "unsolvable cube"}
+    assert service.metrics()["errors"] == 7
+
+def test_solution_and_metrics(service):
+    responses = _handle(service, {"id": "a", "scramble": "LFu"}, {"scramble": "FrDbUlfR", "deadline": 0},
+                        {"op": "metrics", "id": 9})
+    assert {k: responses[0][k] for k in ("id", "solution", "length")} == {"id": "a", "solution": "Ufl", "length": 3}
+    assert responses[1] == {"error": "deadline exceeded"}
+    metrics = responses[2]["metrics"]
+    assert responses[2]["id"] == 9
+    assert metrics["expired"] == 1 and metrics["errors"] == 0 and metrics["workers"] == 1
+    assert metrics["waiting"] == 0
+    assert ("cache" in metrics) == (service.cache is not None)
+
+def test_connection(service, tmp_path):
+    path = str(tmp_path / "service.sock")
+
+    async def run():
+        server = await asyncio.start_unix_server(service.serve_connection, path)
+        async with server:
+            reader, writer = await asyncio.open_unix_connection(path)
+            writer.write(b'{"id": 1, "scramble": "LFu"}\n\n{"id": 2}\n')
+            writer.write_eof()
+            responses = [json.loads(await reader.readline()) for _ in range(2)]
+            writer.close()
+        return sorted(responses, key=lambda r: r["id"])
+
+    responses = asyncio.run(run())
+    assert responses[0]["solution"] == "Ufl"
+    assert responses[1] == {"id": 2, "error": "request holds neither a cube nor a scramble"}
+    metrics = service.metrics()
+    assert metrics["requests"] == metrics["responses"] == 2
+    assert metrics["connections"] == 0
@@ -0,0 +1,29 @@
+import json
+
+import pytest
+
+from bit_cube import solve
+from bit_cube.coord import read_corners, write_corners
+from bit_cube.manipulations import NEW
+
+
+def _twisted():
+    """The solved cube with a single corner twisted, which no sequence of moves solves."""
+    perm, twist = read_corners(NEW)
+    twist[0] = (twist[0] + 1) % 3
+    return write_corners(perm, twist)
+
+@pytest.mark.parametrize("engine", solve.ENGINES)
+def test_unsolvable_cube(engine):
+    record = solve._solve_line(engine, (1, json.dumps({"cube": _twisted()})), None)
+    assert record == {"line": 1, "error": "unsolvable cube"}
+
+@pytest.mark.parametrize("engine", solve.ENGINES)
+def test_solution(engine):
+    record = solve._solve_line(engine, (1, "LFu"), None)
+    assert record == {"line": 1, "solution": "Ufl", "length": 3}
+
+@pytest.mark.parametrize("engine", solve.ENGINES)
+def test_cube_without_valid_corners(engine):
+    record = solve._solve_line(engine, (1, json.dumps({"cube": 5})), None)
+    assert record == {"line": 1, "error": "unsolvable cube"}
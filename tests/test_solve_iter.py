@@ -0,0 +1,26 @@
+from array_cube.solver import Solver as ArraySolver
+from bit_cube.convert import bit_to_array, bit_to_object
+from bit_cube.engine import roll_str
+from bit_cube.manipulations import NEW
+from bit_cube.solver import Solver as BitSolver
+from object_cube.cube import Cube
+from object_cube.fast import FastCube, FastSolver
+from object_cube.node import Solver as ObjectSolver
+
+
+def _solutions(solver):
+    return sorted("".join(s) for s in solver.solve_iter() if isinstance(s, (str, list)))
+
+def test_every_solver_enumerates_the_same_solutions():
+    cube = roll_str(NEW, "LFFU")
+    expected = _solutions(BitSolver(cube))
+    assert len(expected) > 1
+    assert _solutions(ArraySolver(bit_to_array(cube))) == expected
+    assert _solutions(FastSolver(bit_to_object(cube, FastCube))) == expected
+    assert _solutions(ObjectSolver(bit_to_object(cube, Cube))) == expected
+
+def test_unsolvable_cube_has_no_solutions(twisted):
+    assert list(BitSolver(twisted).solve_iter()) == []
+    assert _solutions(ArraySolver(bit_to_array(twisted))) == []
+    assert _solutions(FastSolver(bit_to_object(twisted, FastCube))) == []
+    assert _solutions(ObjectSolver(bit_to_object(twisted, Cube))) == []
@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+
+from array_cube.solver import Solver as ArraySolver
+from bit_cube.coord import recolor
+from bit_cube.engine import roll_str, rot_str
+from bit_cube.manipulations import NEW
+from bit_cube.solver import Solver
+
+
+@pytest.mark.parametrize("scramble", ["", "R", "LFu", "RBdLU", "FrDbU"])
+@pytest.mark.parametrize("mode", [{}, {"bidirectional": True}, {"compact": True}])
+def test_solution_turns_only_l_f_and_u(scramble, mode):
+    cube = rot_str(roll_str(NEW, scramble), "Fl")
+    s = Solver(cube, **mode).solve()
+    assert set(s) <= set("LlFfUu")
+    assert len(s) == len(Solver(cube, bidirectional=True).solve())
+    assert recolor(roll_str(cube, s)) == NEW
+
+def test_invalid_cubes_are_unsolvable():
+    assert Solver(5).solve() is None
+    assert ArraySolver(np.zeros((6, 2, 2), dtype=np.int8)).solve() is None
@@ -0,0 +1,14 @@
+import pytest
+
+from bit_cube.coord import N_STATES
+from bit_cube.table import DistanceTable, open_table
+
+
+def test_open_table_retries_missing_file(tmp_path):
+    path = str(tmp_path / "distances.bin")
+    with pytest.warns(UserWarning):
+        assert open_table(path) is None
+    DistanceTable(bytes(N_STATES)).save(path)
+    table = open_table(path)
+    assert table is not None and len(table.data) == N_STATES
+    assert open_table(path) is table